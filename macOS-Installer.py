@@ -6,17 +6,28 @@ Automates the process of installing macOS on Windows via OpenCore
 
 import os
 import sys
-import subprocess
 import shutil
 import json
-import requests
-import zipfile
+import hashlib
+import fnmatch
 import time
 from pathlib import Path
 from datetime import datetime
-import ctypes
 import platform
+import argparse
 import re
+import threading
+import functools
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+
+# requests, zipfile, subprocess, ctypes and the logging backend are imported
+# where they are used, so --help, --validate and the menu start quickly and
+# install_dependencies can still run when requests is missing
+
+# Cold start budget for --help, checked by --benchmark-startup
+STARTUP_TARGET_SECONDS = 0.25
 
 # Color codes for terminal output
 class Colors:
@@ -30,6 +41,17 @@ class Colors:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
+# Levels of log records; SUCCESS sits between INFO and WARNING
+LOG_LEVELS = {'DEBUG': 10, 'INFO': 20, 'SUCCESS': 25, 'WARNING': 30, 'ERROR': 40}
+
+def timed_step(method):
+    """Record calls and wall time of an installer step in its metrics"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.step_timer(method.__name__):
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class MacOSInstaller:
     def __init__(self):
         self.desktop_path = Path.home() / "Desktop"
@@ -42,14 +64,280 @@ class MacOSInstaller:
             'opencore_url': 'https://github.com/acidanthera/OpenCorePkg/releases/download/latest/OpenCorePkg.zip',
             'rufus_url': 'https://github.com/pbatard/rufus/releases/download/v4.5/rufus-4.5.exe',
         }
-        self.installation_log = []
+        # app_data key -> (Desktop folder, filename, extract subfolder or None)
+        self.tool_artifacts = {
+            'usbtoolbox_url': ('USBTools', 'USBToolBox.exe', None),
+            'usbtoolbox_kext_url': ('USBTools', 'USBToolBox-Kexts.zip', 'Kexts'),
+            'ocat_url': ('MacOSTools', 'OCAT.zip', 'OCAuxiliaryTools'),
+            'opencore_url': ('MacOSTools', 'OpenCorePkg.zip', 'OpenCorePkg'),
+            'rufus_url': ('MacOSTools', 'Rufus.exe', None),
+        }
+        # Only these members are unpacked; later steps never look at the rest
+        self.extract_filters = {
+            'opencore_url': (['Utilities/macrecovery/*', 'X64/EFI/*', 'Docs/*.plist'], []),
+        }
+        self.extract_workers = min(8, os.cpu_count() or 1)
+        # Files later steps look up inside extracted archives
+        self.entry_points = ('OpCore-Simplify.bat', 'macrecovery.py', 'USBToolBox.kext')
+        self._index_lock = threading.Lock()
+        self.macos_versions = {
+            'sequoia': ('Mac-7BA5B2DFE22DDD8C', '00000000000KXPG00'),
+            'sonoma': ('Mac-937A206F2EE63C01', '00000000000LYNZA00'),
+            'ventura': ('Mac-FFE5EF870D7BA81A', '00000000000TYFG0'),
+            'monterey': ('Mac-94245B3640C91DA7', '00000000000GMT0A00'),
+        }
+        self.recovery_job = None
+        # Batch mode: no prompts, downloads follow overwrite_policy (auto/always/never)
+        self.interactive = True
+        self.overwrite_policy = 'auto'
+        self.status_stream = sys.stdout
+        self.max_concurrent_downloads = 4
+        # Shared HTTP session: (connect, read) timeouts, pool size and optional proxy
+        self.http_timeout = (10, 60)
+        self.http_pool_size = 16
+        self.http_proxy = os.environ.get('MACOS_INSTALLER_PROXY')
+        # Budget for the connectivity probe in validate_system
+        self.connectivity_timeout = 2
+        # validate_system probes: name -> (method, timeout in seconds); results live probe_ttl seconds
+        self.validation_probes = {
+            'admin': (self._probe_admin, 5),
+            'os': (self._probe_os, 5),
+            'python': (self._probe_python, 5),
+            'disk_space': (self._probe_disk_space, 5),
+            'download_space': (self._probe_download_space, 5),
+            'disk_throughput': (self._probe_disk_throughput, 20),
+            'internet': (self._probe_internet, self.connectivity_timeout + 1),
+            'bandwidth': (self._probe_bandwidth, 15),
+        }
+        self.probe_ttl = 300
+        self._probe_cache = {}
+        self._probe_lock = threading.Lock()
+        self.required_free_bytes = 10 * 1024**3
+        self.disk_probe_bytes = 32 * 1024**2
+        self.min_disk_mb_per_s = 10
+        self.bandwidth_probe_bytes = 4 * 1024**2
+        self.min_bandwidth_mb_per_s = 0.5
+        self.network_stats = []
+        self._session = None
+        self._session_lock = threading.Lock()
+        self.download_retries = 4
+        self.retry_backoff = 1.0  # seconds, doubled after every failed attempt
+        # Set when the task graph is interrupted so background transfers stop promptly
+        self._cancelled = threading.Event()
+        # Large files from servers with Accept-Ranges are split across connections
+        self.download_segments = 4
+        self.min_segment_size = 8 * 1024**2
+        # Archives fetched without caching are extracted from memory up to this size
+        self.spool_max_bytes = 64 * 1024**2
+        # Copy engine for the USB step; usb_path skips the prompt for the drive
+        self.usb_path = None
+        self.copy_workers = 8
+        self.copy_buffer_size = 4 * 1024**2
+        self.state_path = Path.home() / ".macos-installer"
+        # Chunklist-verified recovery images, one folder per macOS version
+        self.recovery_store_path = self.state_path / "recovery"
+        # Content-addressed download cache; set cache_max_bytes to 0 to disable
+        self.cache_path = self.state_path / "cache"
+        self.cache_max_bytes = 20 * 1024**3
+        shared_cache = os.environ.get('MACOS_INSTALLER_SHARED_CACHE')
+        self.shared_cache_path = Path(shared_cache) if shared_cache else None
+        self.cache_stats = {'hits': 0, 'shared_hits': 0, 'misses': 0}
+        self._cache_lock = threading.RLock()
+        # Token-bucket bandwidth limits in bytes/s: rate_limit for this process,
+        # shared_rate_limit for all installer processes on the machine (None = off)
+        self.rate_limit = None
+        self.shared_rate_limit = None
+        # Lower numbers get bandwidth first; files not listed get 1
+        self.download_priorities = {
+            'OpenCorePkg.zip': 0, 'BaseSystem.dmg': 0, 'BaseSystem.chunklist': 0,
+            'RecoveryImage.dmg': 0, 'RecoveryImage.chunklist': 0,
+            'OCAT.zip': 2, 'Rufus.exe': 2,
+        }
+        self._rate_tokens = 0.0
+        self._rate_updated = time.monotonic()
+        self._rate_waiting = {}
+        self._rate_cond = threading.Condition()
+        # Alternative download URLs per app_data key or URL, tried in order of probed speed
+        self.artifact_mirrors = self._load_json(Path(__file__).with_name("mirrors.json"))
+        self.source_probe_bytes = 256 * 1024
+        # A source slower than this over stall_window seconds is abandoned for the next one
+        self.min_source_throughput = 50 * 1024
+        self.stall_window = 15
+        self._source_ranking = {}
+        self._source_failures = {}
+        self._source_lock = threading.Lock()
+        # Offline sources: an exported bundle file, or an HTTP mirror of an unpacked bundle
+        self.bundle_path = None
+        self.mirror_url = os.environ.get('MACOS_INSTALLER_MIRROR')
+        self._bundle_index = None
+        self._bundle_lock = threading.Lock()
+        self.download_status = {}
+        # Optional expected SHA-256 per app_data key (or URL), shipped next to the script
+        self.pinned_manifest = self._load_json(Path(__file__).with_name("pinned-manifest.json"))
+        self._manifest_lock = threading.Lock()
+        # Recent log records for the menu's log view; the full log goes to log_file
+        self.installation_log = deque(maxlen=2000)
+        self.log_file = self.state_path / "logs" / "installer.jsonl"
+        self.log_max_bytes = 5 * 1024**2
+        self.log_backups = 3
+        self._file_logger = None
+        self._file_logging_started = False
+        self._log_lock = threading.Lock()
+        # Step timings and byte/time counters for the run summary and --metrics-json
+        self.metrics = {'started': datetime.now().isoformat(timespec='seconds'), 'steps': {}, 'counters': {}}
+        self.metrics_path = None
+        self._metrics_lock = threading.Lock()
+        # Prompt time per thread, so steps running in the background are not charged for it
+        self._thread_metrics = threading.local()
+        self._run_started = time.monotonic()
+        self.download_errors = {}
+        # Progress entries: [downloaded, total, render, started, baseline, last marker]
+        self._progress = {}
+        self._single_progress = {}
+        self._progress_lines = 0
+        self._progress_drawn = 0.0
+        self._progress_lock = threading.Lock()
+        # Terminals are redrawn progress_hz times a second; logs get a line per 10%
+        self.progress_tty = sys.stdout.isatty()
+        self.progress_hz = 10
+        self.progress_log_interval = 10
+        # Response bodies are read in blocks of up to 64 KB-1 MB, sized to arrive in about 50-250 ms
+        self.min_read_size = 64 * 1024
+        self.max_read_size = 1024**2
+        # Off while background tasks share the terminal with interactive guides
+        self.render_progress = True
+
+    def _start_file_logging(self):
+        """JSON-lines log file, rotated by size and written by a background thread"""
+        import atexit
+        import logging
+        import logging.handlers
+        import queue
 
-    def log(self, message, level="INFO"):
+        try:
+            self.log_file.parent.mkdir(parents=True, exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                self.log_file, maxBytes=self.log_max_bytes, backupCount=self.log_backups, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            records = queue.SimpleQueue()
+            listener = logging.handlers.QueueListener(records, handler)
+            listener.start()
+            atexit.register(listener.stop)
+            logger = logging.getLogger(f"macos_installer.{id(self)}")
+            logger.propagate = False
+            logger.setLevel(LOG_LEVELS['DEBUG'])
+            logger.addHandler(logging.handlers.QueueHandler(records))
+            return logger
+        except Exception:
+            return None
+
+    def log(self, message, level="INFO", echo=True):
         """Log messages with timestamps"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = f"[{timestamp}] [{level}] {message}"
-        self.installation_log.append(log_entry)
-        print(log_entry)
+        record = {'time': datetime.now().isoformat(timespec='milliseconds'), 'level': level, 'message': message}
+        self.installation_log.append(record)
+        if not self._file_logging_started:
+            with self._log_lock:
+                if not self._file_logging_started:
+                    self._file_logger = self._start_file_logging()
+                    self._file_logging_started = True
+        if self._file_logger:
+            self._file_logger.log(LOG_LEVELS.get(level, LOG_LEVELS['INFO']), json.dumps(record, ensure_ascii=False))
+        if echo:
+            print(self.format_log_record(record))
+
+    def format_log_record(self, record):
+        timestamp = record['time'].replace('T', ' ')[:19]
+        return f"[{timestamp}] [{record['level']}] {record['message']}"
+
+    def log_entries(self, level=None, search=None):
+        """Buffered log records at or above level, optionally containing search"""
+        threshold = LOG_LEVELS.get(level, 0) if level else 0
+        search = search.lower() if search else None
+        return [record for record in list(self.installation_log)
+                if LOG_LEVELS.get(record['level'], LOG_LEVELS['INFO']) >= threshold
+                and (not search or search in record['message'].lower())]
+
+    def prompt(self, message, default=''):
+        """Ask the user for input; in batch mode answer with default instead"""
+        if not self.interactive:
+            self.log(f"{message.strip()} -> {default!r} (batch mode)", echo=False)
+            return default
+        started = time.monotonic()
+        try:
+            return input(message)
+        finally:
+            waited = time.monotonic() - started
+            self._thread_metrics.wait_seconds = self._thread_waited() + waited
+            self.add_metric('wait_seconds', waited)
+
+    def _thread_waited(self):
+        return getattr(self._thread_metrics, 'wait_seconds', 0.0)
+
+    def add_metric(self, name, value):
+        """Add to a run counter (bytes, or seconds spent on network, disk or waiting)"""
+        with self._metrics_lock:
+            counters = self.metrics['counters']
+            counters[name] = counters.get(name, 0) + value
+
+    @contextmanager
+    def step_timer(self, name):
+        """Time a block as a named step; time spent in prompt() on its thread is kept apart"""
+        started = time.monotonic()
+        waited = self._thread_waited()
+        try:
+            yield
+        finally:
+            seconds = time.monotonic() - started
+            waited = self._thread_waited() - waited
+            with self._metrics_lock:
+                step = self.metrics['steps'].setdefault(name, {'calls': 0, 'seconds': 0.0, 'wait_seconds': 0.0})
+                step['calls'] += 1
+                step['seconds'] += seconds
+                step['wait_seconds'] += waited
+
+    def metrics_report(self):
+        """Run metrics as a JSON-friendly dict"""
+        with self._metrics_lock:
+            counters = dict(self.metrics['counters'])
+            steps = {name: dict(step) for name, step in self.metrics['steps'].items()}
+        network = counters.get('network_seconds', 0)
+        latencies = [entry['seconds'] for entry in self.network_stats]
+        return {
+            'started': self.metrics['started'],
+            'machine': {'platform': platform.platform(), 'python': platform.python_version(),
+                        'cpus': os.cpu_count()},
+            'wall_seconds': round(time.monotonic() - self._run_started, 3),
+            'network_seconds': round(network, 3),
+            'disk_seconds': round(counters.get('disk_seconds', 0), 3),
+            'wait_seconds': round(counters.get('wait_seconds', 0), 3),
+            'bytes_downloaded': counters.get('bytes_downloaded', 0),
+            'bytes_extracted': counters.get('bytes_extracted', 0),
+            'bytes_copied': counters.get('bytes_copied', 0),
+            'download_mb_per_s': round(counters.get('bytes_downloaded', 0) / 1024**2 / network, 2) if network else None,
+            'requests': len(latencies),
+            'mean_latency_seconds': round(sum(latencies) / len(latencies), 3) if latencies else None,
+            'steps': {name: {'calls': step['calls'], 'seconds': round(step['seconds'], 3),
+                             'wait_seconds': round(step['wait_seconds'], 3)}
+                      for name, step in steps.items()},
+        }
+
+    def print_metrics_summary(self):
+        """Print where the run's time went"""
+        report = self.metrics_report()
+        print(f"\n{Colors.BOLD}{'Step':<28}{'Calls':>6}{'Wall (s)':>11}{'Waiting (s)':>13}{Colors.ENDC}")
+        for name, step in sorted(report['steps'].items(), key=lambda item: -item[1]['seconds']):
+            print(f"{name:<28}{step['calls']:>6}{step['seconds']:>11.1f}{step['wait_seconds']:>13.1f}")
+        # Network and disk time add up concurrent transfers, so they can exceed the wall time
+        print(f"\nWall time: {report['wall_seconds']:.1f}s, network: {report['network_seconds']:.1f}s, "
+              f"disk: {report['disk_seconds']:.1f}s, waiting for input: {report['wait_seconds']:.1f}s")
+        speed = f" at {report['download_mb_per_s']:.1f} MB/s" if report['download_mb_per_s'] else ""
+        print(f"Downloaded {report['bytes_downloaded'] / 1024**2:.1f} MB{speed}, "
+              f"extracted {report['bytes_extracted'] / 1024**2:.1f} MB, "
+              f"copied {report['bytes_copied'] / 1024**2:.1f} MB")
+
+    def export_metrics(self, path):
+        """Write the run metrics to a JSON file for comparing runs"""
+        Path(path).write_text(json.dumps(self.metrics_report(), indent=2))
 
     def clear_screen(self):
         """Clear terminal screen"""
@@ -57,85 +345,240 @@ class MacOSInstaller:
 
     def print_header(self, text):
         """Print formatted header"""
+        self.log(f"== {text} ==", echo=False)
         print(f"\n{Colors.BOLD}{Colors.HEADER}{'='*60}")
         print(f"  {text}")
         print(f"{'='*60}{Colors.ENDC}\n")
 
     def print_success(self, text):
         """Print success message"""
+        self.log(text, "SUCCESS", echo=False)
         print(f"{Colors.OKGREEN}✓ {text}{Colors.ENDC}")
 
     def print_error(self, text):
         """Print error message"""
+        self.log(text, "ERROR", echo=False)
         print(f"{Colors.FAIL}✗ {text}{Colors.ENDC}")
 
     def print_warning(self, text):
         """Print warning message"""
+        self.log(text, "WARNING", echo=False)
         print(f"{Colors.WARNING}⚠ {text}{Colors.ENDC}")
 
     def print_info(self, text):
         """Print info message"""
+        self.log(text, echo=False)
         print(f"{Colors.OKCYAN}ℹ {text}{Colors.ENDC}")
 
     def is_admin(self):
         """Check if running with administrator privileges"""
+        import ctypes
+
         try:
             return ctypes.windll.shell.IsUserAnAdmin()
         except:
             return False
 
-    def validate_system(self):
-        """Validate system requirements"""
+    @timed_step
+    def validate_system(self, refresh=False):
+        """Validate system requirements.
+
+        Runs the probes in validation_probes side by side, each within its own
+        timeout. Results are cached for probe_ttl seconds, so validating again
+        in the same session is instant unless refresh is set.
+        """
         self.print_header("SYSTEM VALIDATION")
-        
-        validation_passed = True
 
-        # Check admin privileges
-        if not self.is_admin():
-            self.print_error("Administrator privileges required!")
+        results = self.run_probes(refresh=refresh)
+        report = {'ok': self.print_success, 'warning': self.print_warning, 'error': self.print_error}
+        for name, (status, message) in results.items():
+            report[status](message)
+        if results.get('admin', ('ok',))[0] == 'error':
             self.print_info("Please run this script as Administrator")
-            return False
-        self.print_success("Administrator privileges verified")
+        return all(status != 'error' for status, _ in results.values())
+
+    def run_probes(self, names=None, refresh=False):
+        """Run validation probes concurrently: name -> (status, message).
+
+        status is 'ok', 'warning' or 'error'. A probe that raises reports a
+        warning; one that outlives its timeout is reported as timed out and
+        left to finish on its daemon thread, replacing the cached timeout
+        when it does.
+        """
+        names = names or list(self.validation_probes)
+        now = time.monotonic()
+        results = {}
+        threads = {}
+        for name in names:
+            cached = self._probe_cache.get(name)
+            if cached and not refresh and now - cached[0] < self.probe_ttl:
+                results[name] = cached[1]
+                continue
+            probe, _ = self.validation_probes[name]
+
+            def run(name=name, probe=probe):
+                try:
+                    result = probe()
+                except Exception as e:
+                    result = ('warning', f"{name} check failed: {str(e)}")
+                with self._probe_lock:
+                    results[name] = result
+                    self._probe_cache[name] = (time.monotonic(), result)
+
+            threads[name] = threading.Thread(target=run, daemon=True)
+            threads[name].start()
+
+        for name, thread in threads.items():
+            thread.join(max(0, now + self.validation_probes[name][1] - time.monotonic()))
+            with self._probe_lock:
+                if name not in results:
+                    results[name] = ('warning', f"{name} check timed out after {self.validation_probes[name][1]}s")
+                    self._probe_cache[name] = (time.monotonic(), results[name])
+        with self._probe_lock:
+            return {name: results[name] for name in names}
+
+    def _probe_admin(self):
+        if not self.is_admin():
+            return 'error', "Administrator privileges required!"
+        return 'ok', "Administrator privileges verified"
 
-        # Check OS
+    def _probe_os(self):
         if platform.system() != "Windows":
-            self.print_error(f"Windows required. Current OS: {platform.system()}")
-            return False
-        self.print_success(f"OS: {platform.system()} {platform.release()}")
+            return 'error', f"Windows required. Current OS: {platform.system()}"
+        return 'ok', f"OS: {platform.system()} {platform.release()}"
 
-        # Check Python version
+    def _probe_python(self):
         python_version = f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
         if sys.version_info < (3, 8):
-            self.print_error(f"Python 3.8+ required. Current: {python_version}")
-            return False
-        self.print_success(f"Python {python_version} verified")
+            return 'error', f"Python 3.8+ required. Current: {python_version}"
+        return 'ok', f"Python {python_version} verified"
 
-        # Check disk space
-        total, used, free = shutil.disk_usage("/")
-        free_gb = free // (1024**3)
+    def _probe_disk_space(self):
+        """Free space on the system drive, which the macOS partition is shrunk from"""
+        free_gb = shutil.disk_usage(Path.home().anchor).free // (1024**3)
         if free_gb < 150:
-            self.print_warning(f"Low disk space: {free_gb}GB free (recommended: 150GB+)")
-        else:
-            self.print_success(f"Disk space: {free_gb}GB available")
-
-        # Check internet connectivity
+            return 'warning', f"Low disk space: {free_gb}GB free (recommended: 150GB+)"
+        return 'ok', f"Disk space: {free_gb}GB available"
+
+    def _existing_parent(self, path):
+        path = Path(path).resolve()
+        while not path.exists():
+            path = path.parent
+        return path
+
+    def _probe_download_space(self):
+        """Free space on the volumes holding downloads, extracted tools and the cache"""
+        volumes = {}
+        for folder in (self.desktop_path, self.downloads_path, self.state_path):
+            folder = self._existing_parent(folder)
+            volumes.setdefault(folder.stat().st_dev, (folder, shutil.disk_usage(folder).free))
+        low = [f"{folder} ({free / 1024**3:.1f}GB)" for folder, free in volumes.values()
+               if free < self.required_free_bytes]
+        if low:
+            return 'warning', (f"Less than {self.required_free_bytes / 1024**3:.0f}GB free for downloads: "
+                               f"{', '.join(low)}")
+        return 'ok', "Download folders: " + ", ".join(
+            f"{free / 1024**3:.0f}GB free at {folder}" for folder, free in volumes.values())
+
+    def _probe_disk_throughput(self):
+        """Sequential write (flushed to disk) and read-back speed of the output drive"""
+        import tempfile
+
+        folder = self._existing_parent(self.desktop_path)
+        block = os.urandom(1024**2)
+        blocks = max(1, self.disk_probe_bytes // len(block))
+        with tempfile.NamedTemporaryFile(dir=folder, prefix='.probe-') as f:
+            started = time.monotonic()
+            for _ in range(blocks):
+                f.write(block)
+            f.flush()
+            os.fsync(f.fileno())
+            write_speed = blocks / max(time.monotonic() - started, 1e-6)
+            f.seek(0)
+            started = time.monotonic()
+            while f.read(len(block)):
+                pass
+            read_speed = blocks / max(time.monotonic() - started, 1e-6)
+        message = f"Disk at {folder}: write {write_speed:.0f} MB/s, read {read_speed:.0f} MB/s"
+        if write_speed < self.min_disk_mb_per_s:
+            return 'warning', f"Slow disk. {message}"
+        return 'ok', message
+
+    def _probe_internet(self):
         if not self.check_internet():
-            self.print_warning("Internet connectivity may be unstable")
-        else:
-            self.print_success("Internet connectivity verified")
-
-        return True
+            return 'warning', "Internet connectivity may be unstable"
+        return 'ok', "Internet connectivity verified"
+
+    def _probe_bandwidth(self):
+        """Download speed from the artifact host, sampled with a short ranged GET"""
+        url = self.app_data['opencore_url']
+        limit = self.bandwidth_probe_bytes
+        started = time.monotonic()
+        received = 0
+        with self.http_get(url, stream=True, headers={'Range': f'bytes=0-{limit - 1}'}) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                received += len(chunk)
+                if received >= limit:
+                    break
+        speed = received / 1024**2 / max(time.monotonic() - started, 1e-6)
+        host = url.split('/')[2]
+        if speed < self.min_bandwidth_mb_per_s:
+            return 'warning', f"Slow download from {host}: {speed:.1f} MB/s"
+        return 'ok', f"Download speed from {host}: {speed:.1f} MB/s"
 
     def check_internet(self):
         """Check internet connectivity"""
         try:
-            requests.head("https://github.com", timeout=3)
+            self.get_session().head("https://github.com", timeout=self.connectivity_timeout)
             return True
         except:
             return False
 
+    def get_session(self):
+        """Shared keep-alive session used for every HTTP request"""
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+
+                # Only reconnect here; HTTP status and read failures are retried
+                # (with backoff and resume) by _retry_loop
+                retry = Retry(connect=3, read=0, status=0, other=0, backoff_factor=0.5)
+                adapter = HTTPAdapter(
+                    pool_connections=self.http_pool_size,
+                    pool_maxsize=self.http_pool_size,
+                    max_retries=retry,
+                )
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers['User-Agent'] = 'macOS-Installer'
+                if self.http_proxy:
+                    session.proxies = {'http': self.http_proxy, 'https': self.http_proxy}
+                session.hooks['response'].append(self._record_latency)
+                self._session = session
+            return self._session
+
+    def _record_latency(self, response, *args, **kwargs):
+        """Response hook: time from sending the request to receiving the headers"""
+        self.network_stats.append({
+            'url': response.url,
+            'status': response.status_code,
+            'seconds': response.elapsed.total_seconds(),
+        })
+
+    def http_get(self, url, **kwargs):
+        """GET through the shared session with the configured timeouts"""
+        kwargs.setdefault('timeout', self.http_timeout)
+        return self.get_session().get(url, **kwargs)
+
+    @timed_step
     def install_dependencies(self):
         """Install required Python packages"""
+        import subprocess
+
         self.print_header("INSTALLING DEPENDENCIES")
         
         try:
@@ -145,84 +588,1309 @@ class MacOSInstaller:
             self.print_info("Installing requests library...")
             subprocess.check_call([sys.executable, "-m", "pip", "install", "requests", "-q"])
             self.print_success("requests library installed")
+        return True
 
-    def download_file(self, url, destination, filename=None):
-        """Download file from URL with progress"""
+    def download_file(self, url, destination, filename=None, quiet=False, headers=None, use_cache=True):
+        """Download file from URL with progress, resuming interrupted transfers.
+
+        headers are sent with every request for this file; use_cache=False
+        keeps the file out of the download cache.
+        """
         if filename is None:
             filename = url.split('/')[-1]
         
         full_path = Path(destination) / filename
         full_path.parent.mkdir(parents=True, exist_ok=True)
+        part_path = full_path.with_name(full_path.name + '.part')
+
+        entry = self._bundle_entry(url)
+        if entry:
+            return self._download_from_bundle(url, entry, full_path, filename, quiet, use_cache)
+
+        # A local copy of a moving target ("latest", branch archives) is
+        # revalidated with the server; pinned URLs are trusted as they are.
+        # overwrite_policy 'always' ignores local copies, 'never' never revalidates
+        pinned = self._pinned_sha256(url)
+        local = self.cache_lookup(url) if use_cache and self.overwrite_policy != 'always' else None
+        validators = self._load_validators().get(url, {})
+        local_sha256 = local.name if local is not None else None
+        if (local is None and self.overwrite_policy != 'always' and full_path.exists()
+                and validators.get('size') == full_path.stat().st_size):
+            local, local_sha256 = full_path, validators.get('sha256')
+        if local is not None and pinned and local_sha256 != pinned:
+            local = None
+        conditional = {}
+        if local is not None and self._is_moving_url(url) and self.overwrite_policy == 'auto':
+            if validators.get('etag'):
+                conditional['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                conditional['If-Modified-Since'] = validators['last_modified']
+
+        if local is not None and not conditional:
+            self._use_local_copy(local, full_path, filename, 'cached', quiet)
+            self.record_manifest(url, full_path, local_sha256)
+            return full_path
+
+        if not quiet:
+            self.print_info(f"Checking {filename} for updates..." if conditional else f"Downloading {filename}...")
+
+        def attempt():
+            source = self.pick_source(url)
+            try:
+                meta = self._fetch_resumable(url, part_path, filename, conditional, headers, source)
+            except Exception:
+                self._source_failed(url, source)
+                raise
+            if meta.get('not_modified'):
+                self._use_local_copy(local, full_path, filename, 'up to date', quiet)
+                self.record_manifest(url, full_path, local_sha256)
+                return full_path
+            if pinned and meta['sha256'] != pinned:
+                part_path.unlink(missing_ok=True)
+                self._part_meta_path(part_path).unlink(missing_ok=True)
+                raise IOError(f"SHA-256 mismatch: expected {pinned}, got {meta['sha256']}")
+            os.replace(part_path, full_path)
+            self._part_meta_path(part_path).unlink(missing_ok=True)
+            self._save_validator(url, {
+                'etag': meta.get('etag'),
+                'last_modified': meta.get('last_modified'),
+                'size': full_path.stat().st_size,
+                'sha256': meta['sha256'],
+            })
+            if use_cache:
+                self.cache_store(url, full_path, meta)
+            self.record_manifest(url, full_path, meta['sha256'])
+            self.download_status[filename] = 'updated' if local is not None else 'downloaded'
+            if not quiet:
+                print()  # New line after progress
+                self.print_success(f"Downloaded: {filename}")
+            return full_path
+
+        try:
+            return self._retry(attempt, filename, quiet)
+        except Exception as e:
+            self.download_errors[filename] = str(e)
+            if not quiet:
+                self.print_error(f"Failed to download {filename}: {str(e)}")
+            return None
+
+    def throttle(self, filename, amount):
+        """Charge amount transferred bytes to the rate limits, sleeping off any excess.
+
+        Within the process, a transfer waits while one with a higher priority
+        (lower number in download_priorities) is waiting for bandwidth.
+        Returns the seconds spent waiting.
+        """
+        started = time.monotonic()
+        if self.rate_limit:
+            priority = self.download_priorities.get(filename, 1)
+            burst = max(self.rate_limit / 2, self.min_read_size)
+            with self._rate_cond:
+                self._rate_waiting[priority] = self._rate_waiting.get(priority, 0) + 1
+                try:
+                    while True:
+                        now = time.monotonic()
+                        self._rate_tokens = min(burst, self._rate_tokens + (now - self._rate_updated) * self.rate_limit)
+                        self._rate_updated = now
+                        ahead = any(count for level, count in self._rate_waiting.items() if level < priority)
+                        if not ahead and self._rate_tokens > 0:
+                            # Reads are charged after the fact; a deficit is paid by the next caller's wait
+                            self._rate_tokens -= amount
+                            break
+                        self._rate_cond.wait(0.05 if ahead else (1 - self._rate_tokens) / self.rate_limit)
+                finally:
+                    self._rate_waiting[priority] -= 1
+                    self._rate_cond.notify_all()
+        if self.shared_rate_limit:
+            self._throttle_shared(amount)
+        return time.monotonic() - started
+
+    def _throttle_shared(self, amount):
+        """Token bucket kept in a file under state_path and shared by all processes"""
+        state_path = self.state_path / "rate-limit.json"
+        burst = max(self.shared_rate_limit / 2, self.min_read_size)
+        with self._file_lock(self.state_path / "rate-limit.lock"):
+            state = self._load_json(state_path)
+            now = time.time()
+            tokens = min(burst, state.get('tokens', burst) + (now - state.get('updated', now)) * self.shared_rate_limit)
+            tokens -= amount
+            state_path.write_text(json.dumps({'tokens': tokens, 'updated': now}))
+        if tokens < 0:
+            time.sleep(-tokens / self.shared_rate_limit)
+
+    @contextmanager
+    def _file_lock(self, path):
+        """Exclusive lock on a file, held across processes"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a+b') as f:
+            if os.name == 'nt':
+                import msvcrt
+
+                f.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+                try:
+                    yield
+                finally:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def candidate_sources(self, url):
+        """The original URL followed by the mirrors configured for it"""
+        key = next((key for key, value in self.app_data.items() if value == url), None)
+        mirrors = self.artifact_mirrors.get(url) or self.artifact_mirrors.get(key) or []
+        return [url] + [mirror for mirror in mirrors if mirror != url]
+
+    def rank_sources(self, url):
+        """Candidate sources, fastest first; each one is probed once per session"""
+        candidates = self.candidate_sources(url)
+        if len(candidates) < 2:
+            return candidates
+        with self._source_lock:
+            ranked = self._source_ranking.get(url)
+        if ranked is None:
+            with ThreadPoolExecutor(max_workers=len(candidates)) as pool:
+                probes = dict(zip(candidates, pool.map(self._probe_source, candidates)))
+            # Reachable sources by throughput, then latency; unreachable ones last, in configured order
+            ranked = sorted(candidates, key=lambda candidate: (
+                probes[candidate] is None, -(probes[candidate] or (0, 0))[1], (probes[candidate] or (0, 0))[0]))
+            self.log(f"Sources for {url.split('/')[-1]}: " + ", ".join(
+                f"{candidate.split('/')[2]} ({probes[candidate][1] / 1024**2:.1f} MB/s, "
+                f"{probes[candidate][0] * 1000:.0f} ms)" if probes[candidate] else f"{candidate.split('/')[2]} (unreachable)"
+                for candidate in ranked), echo=False)
+            with self._source_lock:
+                self._source_ranking[url] = ranked
+        return ranked
+
+    def _probe_source(self, candidate):
+        """(latency, bytes/s) of a short ranged GET, or None if the source fails"""
+        try:
+            started = time.monotonic()
+            received = 0
+            with self.http_get(candidate, stream=True,
+                               headers={'Range': f'bytes=0-{self.source_probe_bytes - 1}'}) as response:
+                response.raise_for_status()
+                latency = time.monotonic() - started
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    received += len(chunk)
+                    if received >= self.source_probe_bytes:
+                        break
+            return latency, received / max(time.monotonic() - started, 1e-6)
+        except Exception:
+            return None
+
+    def pick_source(self, url):
+        """Best-ranked source of url that has failed the fewest times"""
+        ranked = self.rank_sources(url)
+        with self._source_lock:
+            return min(ranked, key=lambda candidate: (self._source_failures.get(candidate, 0), ranked.index(candidate)))
+
+    def _source_failed(self, url, source):
+        with self._source_lock:
+            self._source_failures[source] = self._source_failures.get(source, 0) + 1
+        if len(self.candidate_sources(url)) > 1:
+            self.log(f"Source {source} failed, switching to the next mirror", "WARNING", echo=False)
+
+    def _check_cancelled(self):
+        if self._cancelled.is_set():
+            raise IOError("Download cancelled")
+
+    def _stall_window(self, failover):
+        """Throughput window for _check_stall, or None when there is no other source to switch to"""
+        return {'start': time.monotonic(), 'bytes': 0, 'paused': 0.0} if failover else None
+
+    def _check_stall(self, window, amount, paused=0.0):
+        """Raise when a source delivers less than min_source_throughput over stall_window.
+
+        paused is time spent waiting on the rate limiter, which does not count.
+        A slow source without alternatives (window None) is left to finish.
+        """
+        if window is None:
+            return
+        now = time.monotonic()
+        window['bytes'] += amount
+        window['paused'] += paused
+        elapsed = now - window['start'] - window['paused']
+        if elapsed >= self.stall_window:
+            if window['bytes'] / elapsed < self.min_source_throughput:
+                raise IOError(f"Source stalled below {self.min_source_throughput / 1024:.0f} KB/s")
+            window.update(start=now, bytes=0, paused=0.0)
+
+    def _load_bundle_index(self):
+        """bundle.json of the configured bundle or mirror ({} when neither is set)"""
+        with self._bundle_lock:
+            if self._bundle_index is None:
+                self._bundle_index = {}
+                try:
+                    if self.bundle_path:
+                        import zipfile
+
+                        with zipfile.ZipFile(self.bundle_path) as bundle:
+                            self._bundle_index = json.loads(bundle.read('bundle.json'))
+                    elif self.mirror_url:
+                        response = self.http_get(f"{self.mirror_url.rstrip('/')}/bundle.json")
+                        response.raise_for_status()
+                        self._bundle_index = response.json()
+                except Exception as e:
+                    self.print_warning(f"Offline bundle unavailable, using the original URLs: {str(e)}")
+            return self._bundle_index
+
+    def _bundle_entry(self, url):
+        if not (self.bundle_path or self.mirror_url):
+            return None
+        return self._load_bundle_index().get('artifacts', {}).get(url)
+
+    def _fetch_bundle_file(self, entry, target, quiet=True):
+        """Copy one bundle file to target from the bundle or the mirror, checking its SHA-256"""
+        target = Path(target)
+        if target.exists() and target.stat().st_size == entry['size'] and self._hash_file(target) == entry['sha256']:
+            return 'cached'
+        target.parent.mkdir(parents=True, exist_ok=True)
+        part_path = target.with_name(target.name + '.part')
+        if self.bundle_path:
+            import zipfile
+
+            sha256 = hashlib.sha256()
+            copied = 0
+            with zipfile.ZipFile(self.bundle_path) as bundle, \
+                    bundle.open(f"files/{entry['sha256']}") as src, open(part_path, 'wb') as dst:
+                for block in iter(lambda: src.read(self.copy_buffer_size), b''):
+                    sha256.update(block)
+                    dst.write(block)
+                    copied += len(block)
+                    self.report_progress(target.name, copied, entry['size'])
+            sha256, status = sha256.hexdigest(), 'from bundle'
+        else:
+            url = f"{self.mirror_url.rstrip('/')}/files/{entry['sha256']}"
+            meta = self._retry(lambda: self._fetch_resumable(url, part_path, target.name), target.name, quiet)
+            self._part_meta_path(part_path).unlink(missing_ok=True)
+            sha256, status = meta['sha256'], 'from mirror'
+        if sha256 != entry['sha256']:
+            part_path.unlink(missing_ok=True)
+            raise IOError(f"SHA-256 mismatch for {target.name} in the bundle: expected {entry['sha256']}, got {sha256}")
+        os.replace(part_path, target)
+        return status
+
+    def _download_from_bundle(self, url, entry, full_path, filename, quiet, use_cache):
+        """download_file for a URL the bundle or mirror provides"""
+        pinned = self._pinned_sha256(url)
+        try:
+            if pinned and entry['sha256'] != pinned:
+                raise IOError(f"Bundle copy does not match the pinned SHA-256 {pinned}")
+            status = self._fetch_bundle_file(entry, full_path, quiet)
+        except Exception as e:
+            self.download_errors[filename] = str(e)
+            if not quiet:
+                self.print_error(f"Failed to get {filename} from the offline bundle: {str(e)}")
+            return None
+        self.report_progress(filename, entry['size'], entry['size'])
+        if use_cache:
+            self.cache_store(url, full_path, {'sha256': entry['sha256']})
+        self.record_manifest(url, full_path, entry['sha256'])
+        self.download_status[filename] = status
+        if not quiet:
+            self.print_success(f"{filename}: {status}")
+        return full_path
+
+    def export_bundle(self, path, versions=()):
+        """Pack every artifact the workflow downloads into one offline bundle.
+
+        The bundle is an uncompressed ZIP holding files/<sha256> for each file
+        and bundle.json, which maps the original URLs, and the recovery image
+        of each macOS version in versions, to those files. Unpacked onto any
+        HTTP server, the same layout serves as a mirror.
+        """
+        import zipfile
+
+        self.print_header("EXPORTING OFFLINE BUNDLE")
+        path = Path(path).expanduser()
+        staging = self.state_path / "bundle-staging"
+        filenames = {key: artifact[1] for key, artifact in self.tool_artifacts.items()}
+        filenames['opcore_url'] = "OpCore-Simplify.zip"
+        jobs = {key: {'url': self.app_data[key], 'destination': staging, 'filename': filename}
+                for key, filename in filenames.items()}
+        self.print_info(f"Collecting {len(jobs)} artifacts...")
+        results = self.download_parallel(jobs)
+        failed = [filenames[key] for key, result in results.items() if not result]
+        if failed:
+            self.print_error(f"Could not download {', '.join(failed)}")
+            return None
 
+        index = {'format': 1, 'created': datetime.now().isoformat(timespec='seconds'),
+                 'artifacts': {}, 'recovery': {}}
+        files = {}
+        for key, file_path in results.items():
+            sha256 = self._hash_file(file_path)
+            index['artifacts'][self.app_data[key]] = {
+                'key': key, 'filename': filenames[key], 'sha256': sha256, 'size': file_path.stat().st_size,
+            }
+            files[sha256] = file_path
+
+        for version in versions:
+            store = self.recovery_store_path / version / "com.apple.recovery.boot"
+            if not self._recovery_store_valid(store):
+                self.print_info(f"Fetching {version.capitalize()} recovery image...")
+                job = {'version': version, 'status': 'running', 'files': [], 'result': None}
+                self._run_recovery_job(job, staging / "macOS_Recovery", quiet=False)
+                if not self._recovery_store_valid(store):
+                    self.print_error(f"No verified {version.capitalize()} recovery image to bundle")
+                    return None
+            marker = self._load_json(store / "verified.json")
+            index['recovery'][version] = {}
+            for part in ('dmg', 'chunklist'):
+                file_path = store / marker[part]
+                sha256 = self._hash_file(file_path)
+                index['recovery'][version][part] = {
+                    'name': marker[part], 'sha256': sha256, 'size': file_path.stat().st_size,
+                }
+                files[sha256] = file_path
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_STORED, allowZip64=True) as bundle:
+            for sha256, file_path in files.items():
+                bundle.write(file_path, f"files/{sha256}")
+            bundle.writestr('bundle.json', json.dumps(index, indent=2))
+        os.replace(tmp_path, path)
+        shutil.rmtree(staging, ignore_errors=True)
+        self.print_success(f"Bundle written to {path}: {len(index['artifacts'])} artifacts, "
+                           f"{len(index['recovery'])} recovery images, {path.stat().st_size / 1024**2:.1f} MB")
+        return path
+
+    def _retry(self, operation, filename, quiet=False):
+        """Call operation(), retrying with exponential backoff on transient errors.
+
+        The time spent, backoff included, counts as network time.
+        """
+        started = time.monotonic()
         try:
-            self.print_info(f"Downloading {filename}...")
-            response = requests.get(url, stream=True)
+            return self._retry_loop(operation, filename, quiet)
+        finally:
+            self.add_metric('network_seconds', time.monotonic() - started)
+
+    def _retry_loop(self, operation, filename, quiet):
+        for attempt in range(1, self.download_retries + 1):
+            try:
+                return operation()
+            except Exception as e:
+                if attempt == self.download_retries or not self._is_retryable(e) or self._cancelled.is_set():
+                    raise
+                delay = self.retry_backoff * 2 ** (attempt - 1)
+                if not quiet:
+                    print()
+                    self.print_warning(f"{filename}: {str(e)} - retrying in {delay:.0f}s "
+                                       f"(attempt {attempt + 1}/{self.download_retries})")
+                if self._cancelled.wait(delay):
+                    raise
+
+    def download_to_buffer(self, url, filename, quiet=False, conditional=None):
+        """Download into a SpooledTemporaryFile instead of a file on disk.
+
+        Small archives stay in memory; larger ones spill to a temporary file
+        that is deleted on close. Returns (buffer, meta) with the buffer
+        rewound, or (None, meta) when the server answers 304 Not Modified.
+        """
+        import tempfile
+
+        pinned = self._pinned_sha256(url)
+        buffer = tempfile.SpooledTemporaryFile(max_size=self.spool_max_bytes)
+        meta = {}
+
+        def attempt():
+            # Resume a dropped transfer from what the buffer already holds,
+            # unless it came from another source
+            source = self.pick_source(url)
+            offset = buffer.tell() if meta.get('source', source) == source else 0
+            headers = {'Range': f'bytes={offset}-'} if offset else dict(conditional or {})
+            if offset and self._if_range(meta):
+                headers['If-Range'] = self._if_range(meta)
+            meta['source'] = source
+            try:
+                fetch(source, offset, headers)
+            except Exception:
+                self._source_failed(url, source)
+                raise
+
+        def fetch(source, offset, headers):
+            response = self.http_get(source, stream=True, headers=headers)
+            if response.status_code == 304:
+                response.close()
+                meta['not_modified'] = True
+                return
             response.raise_for_status()
-            
+            if not (offset and response.status_code == 206):
+                offset = 0
+                meta['sha256_state'] = hashlib.sha256()
+            meta['etag'] = response.headers.get('etag')
+            meta['last_modified'] = response.headers.get('last-modified')
+            buffer.seek(offset)
+            buffer.truncate(offset)
             total_size = int(response.headers.get('content-length', 0))
-            downloaded = 0
-            
-            with open(full_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        if total_size:
-                            progress = (downloaded / total_size) * 100
-                            print(f"\rProgress: {progress:.1f}%", end='')
-            
-            print()  # New line after progress
-            self.print_success(f"Downloaded: {filename}")
-            return full_path
+            total_size = total_size + offset if total_size else 0
+            downloaded = self._stream_response(response, buffer, meta['sha256_state'], offset, total_size, filename,
+                                               failover=len(self.candidate_sources(url)) > 1)
+            if total_size and downloaded != total_size:
+                raise IOError(f"Incomplete download: {downloaded} of {total_size} bytes")
+
+        try:
+            self._retry(attempt, filename, quiet)
+        except Exception:
+            buffer.close()
+            raise
+        if meta.get('not_modified'):
+            buffer.close()
+            return None, meta
+
+        meta['sha256'] = meta.pop('sha256_state').hexdigest()
+        meta['size'] = buffer.tell()
+        if pinned and meta['sha256'] != pinned:
+            buffer.close()
+            raise IOError(f"SHA-256 mismatch: expected {pinned}, got {meta['sha256']}")
+        buffer.seek(0)
+        return buffer, meta
+
+    def fetch_archive(self, url, destination, filename, extract_to, include=None, exclude=None, quiet=False):
+        """Download a ZIP archive and extract it, returning the extract folder.
+
+        With caching enabled the archive is kept on disk (it doubles as the cache
+        object). Otherwise it is spooled in memory and extracted straight from
+        the buffer, so it is never written out and read back.
+        """
+        import zipfile
+
+        extract_to = Path(extract_to)
+        if self.cache_max_bytes or self._bundle_entry(url):
+            zip_path = self.download_file(url, destination, filename, quiet)
+            if not zip_path:
+                return None
+            # Re-extracting an unchanged archive only rewrites members that are missing or damaged
+            if self.extract_zip(zip_path, extract_to, quiet=quiet, include=include, exclude=exclude):
+                return extract_to
+            return None
+
+        validators = self._load_validators().get(url, {})
+        conditional = {}
+        if (extract_to.exists() and validators and self.overwrite_policy != 'always'
+                and self._extracted_tree_intact(extract_to, validators.get('members'))):
+            if not self._is_moving_url(url) or self.overwrite_policy == 'never':
+                self.download_status[filename] = 'cached'
+                self.report_progress(filename, validators['size'], validators['size'])
+                return extract_to
+            if validators.get('etag'):
+                conditional['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                conditional['If-Modified-Since'] = validators['last_modified']
+
+        if not quiet:
+            self.print_info(f"Checking {filename} for updates..." if conditional else f"Downloading {filename}...")
+        try:
+            buffer, meta = self.download_to_buffer(url, filename, quiet, conditional)
         except Exception as e:
-            self.print_error(f"Failed to download {filename}: {str(e)}")
+            self.download_errors[filename] = str(e)
+            if not quiet:
+                self.print_error(f"Failed to download {filename}: {str(e)}")
             return None
+        if not quiet:
+            print()
+        if buffer is None:
+            self.download_status[filename] = 'up to date'
+            if not quiet:
+                self.print_success(f"{filename} is up to date")
+            return extract_to
+
+        with buffer:
+            self.download_status[filename] = 'updated' if extract_to.exists() else 'downloaded'
+            if not self.extract_zip(buffer, extract_to, name=filename, quiet=quiet,
+                                    include=include, exclude=exclude):
+                return None
+            with zipfile.ZipFile(buffer) as zip_ref:
+                members = {info.filename: [info.file_size, info.CRC] for info in zip_ref.infolist()
+                           if not info.is_dir() and self._member_selected(info.filename, include, exclude)}
+        validator = {key: meta.get(key) for key in ('etag', 'last_modified', 'size', 'sha256')}
+        self._save_validator(url, dict(validator, members=members))
+        return extract_to
+
+    def _extracted_tree_intact(self, extract_to, members):
+        """True if every recorded archive member is still on disk with the same size and CRC"""
+        import zipfile
+
+        if members is None:
+            return False
+        for name, (size, crc) in members.items():
+            info = zipfile.ZipInfo(name)
+            info.file_size, info.CRC = size, crc
+            if not self._member_unchanged(info, self._member_target(extract_to, name)):
+                return False
+        return True
+
+    def _load_json(self, path, default=None):
+        """Read a JSON file, returning default (an empty dict) if it is missing or invalid"""
+        try:
+            return json.loads(Path(path).read_text())
+        except (OSError, ValueError):
+            return {} if default is None else default
+
+    def _write_json_atomic(self, path, data, indent=1):
+        """Write JSON through a per-process temporary file so readers never see a partial file"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(data, indent=indent))
+        os.replace(tmp_path, path)
+
+    def _pinned_sha256(self, url):
+        """Expected SHA-256 for url from the pinned manifest, if any"""
+        for key, sha256 in self.pinned_manifest.items():
+            if key == url or self.app_data.get(key) == url:
+                return sha256.lower()
+        return None
+
+    def load_manifest(self, folder):
+        """Integrity manifest of a tools folder: filename -> url, size, sha256, timestamp"""
+        return self._load_json(Path(folder) / "manifest.json")
+
+    def record_manifest(self, url, path, sha256):
+        """Add a downloaded file to the manifest.json of its folder"""
+        path = Path(path)
+        if sha256 is None:
+            sha256 = self._hash_file(path)
+        with self._manifest_lock:
+            manifest = self.load_manifest(path.parent)
+            manifest[path.name] = {
+                'url': url,
+                'size': path.stat().st_size,
+                'sha256': sha256,
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+            }
+            self._write_json_atomic(path.parent / "manifest.json", manifest, indent=2)
+
+    def verify_file(self, path, sha256=None, manifest=None):
+        """Check a file against the entry in its folder's manifest.
+
+        sha256 is the file's hash when the caller already has it (e.g. from a
+        copy), so the file is not read again. Returns None if the manifest
+        has no entry for the file.
+        """
+        path = Path(path)
+        entry = (self.load_manifest(path.parent) if manifest is None else manifest).get(path.name)
+        if not entry:
+            return None
+        if entry['size'] != path.stat().st_size:
+            return False
+        return (sha256 or self._hash_file(path)) == entry['sha256']
+
+    def _use_local_copy(self, local, full_path, filename, status, quiet):
+        """Serve a download from a cached or already present file"""
+        if Path(local) != full_path:
+            self._place_file(local, full_path)
+        size = full_path.stat().st_size
+        self.report_progress(filename, size, size)
+        self.download_status[filename] = status
+        if not quiet:
+            print()
+            self.print_success(f"{filename} is up to date" if status == 'up to date'
+                               else f"Using cached copy: {filename}")
+
+    def _is_moving_url(self, url):
+        """URLs whose content changes over time without the URL changing"""
+        return '/latest/' in url or '/refs/heads/' in url
+
+    def _load_validators(self):
+        """Persisted ETag/Last-Modified/size/SHA-256 per artifact URL"""
+        return self._load_json(self.state_path / "validators.json")
+
+    def _save_validator(self, url, validator):
+        with self._cache_lock:
+            validators = self._load_validators()
+            validators[url] = validator
+            self._write_json_atomic(self.state_path / "validators.json", validators)
+
+    def _part_meta_path(self, part_path):
+        """Sidecar file holding resume metadata for a .part download"""
+        return part_path.with_name(part_path.name + '.json')
+
+    def _is_retryable(self, error):
+        """Client errors (404, 403, ...) will not go away by retrying"""
+        import requests
+
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            status = error.response.status_code
+            return status >= 500 or status in (408, 429)
+        return True
 
-    def extract_zip(self, zip_path, extract_to):
-        """Extract ZIP file"""
+    def _if_range(self, meta):
+        """Validator for If-Range; weak ETags are not allowed there"""
+        etag = meta.get('etag') or ''
+        return etag if etag and not etag.startswith('W/') else meta.get('last_modified')
+
+    def _fetch_resumable(self, url, part_path, filename, conditional=None, base_headers=None, source=None):
+        """Fetch url into part_path, continuing from a previous partial transfer.
+
+        conditional holds If-None-Match/If-Modified-Since headers for a fresh
+        request; a 304 reply returns {'not_modified': True} without a body.
+        source is the mirror of url to request from; a transfer started on
+        another source resumes when the new one reports the same total size.
+        """
+        source = source or url
+        failover = len(self.candidate_sources(url)) > 1
+        meta_path = self._part_meta_path(part_path)
+        meta = self._load_json(meta_path) if part_path.exists() else {}
+        if meta.get('url') != url:
+            meta = {}
+        same_source = meta.get('source', url) == source
+
+        if meta.get('segments') and part_path.stat().st_size == meta.get('size'):
+            self._fetch_segmented(source, part_path, meta, filename, headers=base_headers, failover=failover)
+            meta['source'] = source
+            meta['sha256'] = self._hash_file(part_path)
+            return meta
+
+        offset = meta.get('received', 0)
+        offset = min(offset, part_path.stat().st_size) if part_path.exists() else 0
+        if offset and not same_source and not meta.get('total'):
+            offset = 0
+
+        headers = dict(base_headers or {})
+        if offset:
+            headers['Range'] = f'bytes={offset}-'
+            validator = self._if_range(meta) if same_source else None
+            if validator:
+                headers['If-Range'] = validator
+        elif conditional:
+            headers.update(conditional)
+
+        response = self.http_get(source, stream=True, headers=headers)
+        if response.status_code == 304:
+            response.close()
+            return {'not_modified': True}
+        if response.status_code == 416 and offset:
+            # Our partial file no longer matches the remote one; drop it and start over
+            response.close()
+            part_path.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+            return self._fetch_resumable(url, part_path, filename, conditional, base_headers, source)
+        response.raise_for_status()
+
+        content_range = response.headers.get('content-range', '')
+        if not (offset and response.status_code == 206 and content_range.startswith(f'bytes {offset}-')
+                and (same_source or content_range.endswith(f"/{meta['total']}"))):
+            offset = 0  # Server ignored the range request, start over
+
+        total_size = int(response.headers.get('content-length', 0))
+        meta = {
+            'url': url,
+            'source': source,
+            'etag': response.headers.get('etag'),
+            'last_modified': response.headers.get('last-modified'),
+            'received': offset,
+            'total': total_size + offset if total_size else None,
+        }
+
+        if (not offset and self.download_segments > 1
+                and response.headers.get('accept-ranges', '').lower() == 'bytes'
+                and total_size >= 2 * self.min_segment_size):
+            segment_count = min(self.download_segments, total_size // self.min_segment_size)
+            segment_size = -(-total_size // segment_count)
+            meta['size'] = total_size
+            meta['segments'] = [
+                [start, min(start + segment_size, total_size) - 1, 0]
+                for start in range(0, total_size, segment_size)
+            ]
+            with open(part_path, 'wb') as f:
+                f.truncate(total_size)
+            self._fetch_segmented(source, part_path, meta, filename, response, base_headers, failover)
+            meta['sha256'] = self._hash_file(part_path)
+            return meta
+
+        meta_path.write_text(json.dumps(meta))
+        if total_size:
+            total_size += offset
+        downloaded = offset
+
+        # Hash while streaming; only a resumed prefix has to be read back
+        sha256 = hashlib.sha256()
+        with open(part_path, 'r+b' if offset else 'wb') as f:
+            f.truncate(offset)
+            while f.tell() < offset:
+                sha256.update(f.read(min(1024**2, offset - f.tell())))
+            f.seek(offset)
+            try:
+                downloaded = self._stream_response(response, f, sha256, downloaded, total_size, filename, meta,
+                                                   failover)
+            finally:
+                response.close()
+                f.flush()
+                meta_path.write_text(json.dumps(meta))
+
+        if total_size and downloaded != total_size:
+            raise IOError(f"Incomplete download: {downloaded} of {total_size} bytes")
+        meta['sha256'] = sha256.hexdigest()
+        return meta
+
+    def _stream_response(self, response, f, sha256, downloaded, total_size, filename, meta=None, failover=False):
+        """Write a response body to f, hashing it and reporting progress.
+
+        meta['received'] tracks the byte count even if the stream breaks.
+        """
+        meta = {} if meta is None else meta
+        meta['received'] = start = downloaded
+        window = self._stall_window(failover)
         try:
-            self.print_info(f"Extracting {zip_path.name}...")
+            for chunk in self._read_chunks(response):
+                if chunk:
+                    f.write(chunk)
+                    sha256.update(chunk)
+                    downloaded += len(chunk)
+                    meta['received'] = downloaded
+                    self.report_progress(filename, downloaded, total_size)
+                    self._check_cancelled()
+                    self._check_stall(window, len(chunk), self.throttle(filename, len(chunk)))
+        finally:
+            self.add_metric('bytes_downloaded', downloaded - start)
+        return downloaded
+
+    def _read_chunks(self, response):
+        """Yield a response body in blocks of up to the current read size.
+
+        read1() returns what the connection has available instead of waiting
+        for a full block, so progress and stall checks keep running on slow
+        links. The read size doubles while blocks fill quickly and halves when
+        they are slow to arrive.
+        """
+        if response.headers.get('content-encoding', 'identity') != 'identity':
+            yield from response.iter_content(chunk_size=self.min_read_size)
+            return
+        read = getattr(response.raw, 'read1', None) or response.raw.read  # read1 needs urllib3 2.x
+        # Under a rate limit, smaller reads keep the throttled stream smooth
+        limits = [limit for limit in (self.rate_limit, self.shared_rate_limit) if limit]
+        largest = max(self.min_read_size, min([self.max_read_size] + [int(limit) // 4 for limit in limits]))
+        size = min(256 * 1024, largest)
+        while True:
+            started = time.monotonic()
+            block = read(size)
+            if not block:
+                return
+            elapsed = time.monotonic() - started
+            yield block
+            if len(block) == size and elapsed < 0.05:
+                size = min(size * 2, largest)
+            elif elapsed > 0.25:
+                size = max(size // 2, self.min_read_size)
+
+    def _fetch_segmented(self, url, part_path, meta, filename, first_response=None, headers=None, failover=False):
+        """Fetch byte-range segments on parallel connections into a preallocated file.
+
+        meta['segments'] holds [start, end, received] per segment and is saved to
+        the sidecar so an interrupted transfer resumes each segment separately.
+        first_response, when given, is an open response streaming from byte 0
+        and is used for the first segment instead of a new request. Segments
+        arrive out of order, so callers hash the assembled file afterwards.
+        """
+        meta_path = self._part_meta_path(part_path)
+        meta_path.write_text(json.dumps(meta))
+        total_size = meta['size']
+        lock = threading.Lock()
+        state = {'changed': False}
+
+        def done_bytes():
+            return sum(segment[2] for segment in meta['segments'])
+
+        def fetch_segment(segment, response=None):
+            start, end, received = segment
+            position = start + received
+            if position > end:
+                return
+            if response is None:
+                segment_headers = dict(headers or {}, Range=f'bytes={position}-{end}')
+                # Validators belong to the host that issued them; other sources are matched by size
+                validator = self._if_range(meta) if meta.get('source', url) == url else None
+                if validator:
+                    segment_headers['If-Range'] = validator
+                response = self.http_get(url, stream=True, headers=segment_headers)
+                response.raise_for_status()
+                content_range = response.headers.get('content-range', '')
+                if (response.status_code != 206 or not content_range.startswith(f'bytes {position}-')
+                        or not content_range.endswith(f'/{total_size}')):
+                    state['changed'] = True
+                    response.close()
+                    raise IOError("Remote file changed during segmented download")
+            first = position
+            window = self._stall_window(failover)
+            try:
+                with open(part_path, 'r+b') as f:
+                    for chunk in self._read_chunks(response):
+                        if not chunk:
+                            continue
+                        chunk = chunk[:end + 1 - position]
+                        if hasattr(os, 'pwrite'):
+                            os.pwrite(f.fileno(), chunk, position)
+                        else:
+                            f.seek(position)
+                            f.write(chunk)
+                        position += len(chunk)
+                        with lock:
+                            segment[2] = position - start
+                            downloaded = done_bytes()
+                        self.report_progress(filename, downloaded, total_size)
+                        self._check_cancelled()
+                        self._check_stall(window, len(chunk), self.throttle(filename, len(chunk)))
+                        if position > end:
+                            break
+            finally:
+                response.close()
+                self.add_metric('bytes_downloaded', position - first)
+            if position <= end:
+                raise IOError(f"Incomplete segment at byte {position}")
+
+        error = None
+        try:
+            with ThreadPoolExecutor(max_workers=len(meta['segments'])) as pool:
+                futures = [
+                    pool.submit(fetch_segment, segment, first_response if index == 0 else None)
+                    for index, segment in enumerate(meta['segments'])
+                ]
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        error = error or e
+        finally:
+            if state['changed']:
+                part_path.unlink(missing_ok=True)
+                meta_path.unlink(missing_ok=True)
+            else:
+                meta_path.write_text(json.dumps(meta))
+        if error:
+            raise error
+
+    def _place_file(self, source, target):
+        """Hardlink source to target, copying when linking is not possible"""
+        target = Path(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.unlink(missing_ok=True)
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+
+    def _hash_file(self, path):
+        """SHA-256 of a file on disk"""
+        sha256 = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024**2), b''):
+                sha256.update(block)
+        return sha256.hexdigest()
+
+    def _cache_object_path(self, root, sha256):
+        return Path(root) / "objects" / sha256[:2] / sha256
+
+    def _load_cache_index(self, root):
+        """Read a cache index: urls -> validators + sha256, objects -> size + last use"""
+        index = self._load_json(Path(root) / "index.json")
+        index.setdefault('urls', {})
+        index.setdefault('objects', {})
+        return index
+
+    def _save_cache_index(self, index):
+        self._write_json_atomic(self.cache_path / "index.json", index)
+
+    def cache_lookup(self, url):
+        """Return the cached file for url, checking the local then the shared cache"""
+        if not self.cache_max_bytes:
+            return None
+        with self._cache_lock:
+            index = self._load_cache_index(self.cache_path)
+            entry = index['urls'].get(url)
+            if entry:
+                obj = self._cache_object_path(self.cache_path, entry['sha256'])
+                if obj.exists() and obj.stat().st_size == entry['size']:
+                    index['objects'].setdefault(entry['sha256'], {'size': entry['size']})['last_used'] = time.time()
+                    self._save_cache_index(index)
+                    self.cache_stats['hits'] += 1
+                    self.log(f"Cache hit: {url}", echo=False)
+                    return obj
+
+            if self.shared_cache_path:
+                shared_entry = self._load_cache_index(self.shared_cache_path)['urls'].get(url)
+                if shared_entry:
+                    shared_obj = self._cache_object_path(self.shared_cache_path, shared_entry['sha256'])
+                    if shared_obj.exists() and shared_obj.stat().st_size == shared_entry['size']:
+                        obj = self._cache_object_path(self.cache_path, shared_entry['sha256'])
+                        obj.parent.mkdir(parents=True, exist_ok=True)
+                        shutil.copyfile(shared_obj, obj)
+                        self._index_object(index, url, shared_entry)
+                        self._save_validator(url, {key: shared_entry.get(key)
+                                                   for key in ('etag', 'last_modified', 'size')})
+                        self.cache_stats['shared_hits'] += 1
+                        self.log(f"Shared cache hit: {url}", echo=False)
+                        return obj
+
+            self.cache_stats['misses'] += 1
+            self.log(f"Cache miss: {url}", echo=False)
+            return None
+
+    def cache_store(self, url, path, meta=None):
+        """Add a downloaded file to the cache under its SHA-256"""
+        if not self.cache_max_bytes:
+            return
+        meta = meta or {}
+        entry = {
+            'sha256': meta.get('sha256') or self._hash_file(path),
+            'size': Path(path).stat().st_size,
+            'etag': meta.get('etag'),
+            'last_modified': meta.get('last_modified'),
+        }
+        obj = self._cache_object_path(self.cache_path, entry['sha256'])
+        try:
+            with self._cache_lock:
+                if not obj.exists():
+                    obj.parent.mkdir(parents=True, exist_ok=True)
+                    self._place_file(path, obj)
+                index = self._load_cache_index(self.cache_path)
+                self._index_object(index, url, entry)
+        except OSError as e:
+            self.log(f"Could not cache {url}: {str(e)}", "WARNING", echo=False)
+
+    def _index_object(self, index, url, entry):
+        """Record url -> object in the index and evict least recently used objects"""
+        index['urls'][url] = {key: entry.get(key) for key in ('sha256', 'size', 'etag', 'last_modified')}
+        index['objects'][entry['sha256']] = {'size': entry['size'], 'last_used': time.time()}
+
+        total = sum(obj['size'] for obj in index['objects'].values())
+        for sha256, obj in sorted(index['objects'].items(), key=lambda item: item[1].get('last_used', 0)):
+            if total <= self.cache_max_bytes or sha256 == entry['sha256']:
+                continue
+            self._cache_object_path(self.cache_path, sha256).unlink(missing_ok=True)
+            del index['objects'][sha256]
+            index['urls'] = {u: e for u, e in index['urls'].items() if e['sha256'] != sha256}
+            total -= obj['size']
+        self._save_cache_index(index)
+
+    def report_progress(self, filename, downloaded, total_size):
+        """Record the progress of a download and refresh the display when due.
+
+        A terminal is redrawn at most progress_hz times a second; other
+        outputs get a plain line per 10% (or every progress_log_interval
+        seconds when the size is unknown).
+        """
+        now = time.monotonic()
+        with self._progress_lock:
+            entry = self._progress.get(filename)
+            single = entry is None
+            if single:
+                if not self.render_progress:
+                    return
+                entry = self._single_progress.setdefault(filename, [0, 0, True, None, 0, 0])
+                if downloaded < entry[0]:
+                    entry[3] = None
+            if entry[3] is None:
+                entry[3], entry[4] = now, downloaded
+            entry[0], entry[1] = downloaded, total_size
+            if not entry[2]:
+                return
+            finished = bool(total_size) and downloaded >= total_size
+            if not self.progress_tty:
+                marker = (downloaded * 10 // total_size if total_size
+                          else int((now - entry[3]) // self.progress_log_interval))
+                if marker != entry[5]:
+                    entry[5] = marker
+                    print(f"  {filename:<28} {self._format_progress(entry, now)}")
+            elif finished or now - self._progress_drawn >= 1 / self.progress_hz:
+                self._progress_drawn = now
+                if single:
+                    sys.stdout.write(f"\rProgress: {self._format_progress(entry, now)}\033[K")
+                    sys.stdout.flush()
+                else:
+                    self._render_progress(now)
+            if single and finished:
+                del self._single_progress[filename]
+
+    def _format_progress(self, entry, now):
+        """Percentage, size, speed and ETA of a progress entry"""
+        downloaded, total_size, _, started, baseline = entry[:5]
+        elapsed = now - started if started is not None else 0
+        speed = (downloaded - baseline) / elapsed if elapsed >= 0.5 else 0
+        if total_size:
+            text = f"{(downloaded / total_size) * 100:5.1f}% of {total_size / 1024**2:.1f} MB"
+        else:
+            text = f"{downloaded / 1024**2:.1f} MB"
+        if speed:
+            text += f"  {speed / 1024**2:.1f} MB/s"
+            if total_size and downloaded < total_size:
+                minutes, seconds = divmod(int((total_size - downloaded) / speed), 60)
+                text += f"  ETA {minutes}:{seconds:02d}"
+        return text
+
+    def _render_progress(self, now=None):
+        """Redraw one progress line per displayed download (caller holds the lock)"""
+        if not self.progress_tty:
+            return
+        now = now or time.monotonic()
+        shown = [(name, entry) for name, entry in self._progress.items() if entry[2]]
+        if self._progress_lines:
+            sys.stdout.write(f"\033[{self._progress_lines}F")
+        for name, entry in shown:
+            sys.stdout.write(f"\033[2K  {name:<28} {self._format_progress(entry, now)}\n")
+        sys.stdout.flush()
+        self._progress_lines = len(shown)
+
+    def track_progress(self, filenames, render=True):
+        """Start collecting progress for filenames; rendered ones get a display line"""
+        with self._progress_lock:
+            for filename in filenames:
+                self._progress[filename] = [0, 0, render, None, 0, 0]
+            if render:
+                self._progress_lines = 0
+                self._render_progress()
+
+    def untrack_progress(self, filenames):
+        with self._progress_lock:
+            for filename in filenames:
+                entry = self._progress.pop(filename, None)
+                if entry and entry[2]:
+                    self._progress_lines = 0
+
+    def progress_of(self, filenames):
+        """Combined (downloaded, total) of tracked downloads"""
+        with self._progress_lock:
+            entries = [self._progress[name] for name in filenames if name in self._progress]
+        return sum(entry[0] for entry in entries), sum(entry[1] for entry in entries)
+
+    def download_parallel(self, jobs, max_workers=None, render=True):
+        """Download several files side by side.
+
+        jobs maps a label to (url, destination, filename), to a dict of
+        download_file keyword arguments, or, for ZIP archives that are
+        extracted as they arrive, to (url, destination, filename, extract_to[,
+        include, exclude]). Returns a dict of label -> downloaded file or
+        extract folder, or None for downloads that failed.
+        """
+        max_workers = max_workers or self.max_concurrent_downloads
+        filenames = [job['filename'] if isinstance(job, dict) else job[2] for job in jobs.values()]
+        self.track_progress(filenames, render and self.render_progress)
+
+        results = {}
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                futures = {}
+                # Critical-path files take the first worker slots
+                for label, job in sorted(jobs.items(), key=lambda item: self.download_priorities.get(
+                        item[1]['filename'] if isinstance(item[1], dict) else item[1][2], 1)):
+                    if isinstance(job, dict):
+                        futures[pool.submit(self.download_file, quiet=True, **job)] = label
+                    elif len(job) > 3:
+                        futures[pool.submit(self.fetch_archive, *job, quiet=True)] = label
+                    else:
+                        futures[pool.submit(self.download_file, *job, quiet=True)] = label
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+        finally:
+            self.untrack_progress(filenames)
+        return results
+
+    def download_tools(self, keys=None):
+        """Download tool artifacts from app_data concurrently and extract archives"""
+        keys = keys or list(self.tool_artifacts)
+        jobs = {}
+        for key in keys:
+            folder, filename, extract_to = self.tool_artifacts[key]
+            jobs[key] = (self.app_data[key], self.desktop_path / folder, filename)
+            if extract_to:
+                jobs[key] += (self.desktop_path / folder / extract_to,) + self.extract_filters.get(key, (None, None))
+
+        self.print_info(f"Downloading {len(jobs)} files "
+                        f"({self.max_concurrent_downloads} at a time)...")
+        results = self.download_parallel(jobs)
+
+        for key in keys:
+            folder, filename, extract_to = self.tool_artifacts[key]
+            path = results.get(key)
+            if not path:
+                self.print_error(f"{filename}: {self.download_errors.get(filename, 'download failed')}")
+                continue
+            status = self.download_status.get(filename, 'downloaded')
+            self.print_success(f"{filename}: {status}" + (f", extracted to {path}" if extract_to else ""))
+
+        self.log(f"Cache statistics: {self.cache_stats['hits']} hits, "
+                 f"{self.cache_stats['shared_hits']} shared hits, {self.cache_stats['misses']} misses",
+                 echo=False)
+        failed = [self.tool_artifacts[key][1] for key in keys if not results.get(key)]
+        if failed:
+            self.print_warning(f"{len(keys) - len(failed)}/{len(keys)} artifacts ready; failed: {', '.join(failed)}")
+        else:
+            self.print_success(f"All {len(keys)} artifacts ready")
+        return results
+
+    def extract_zip(self, zip_path, extract_to, name=None, quiet=False, include=None, exclude=None):
+        """Extract ZIP file (a path or an open binary file object).
+
+        include/exclude are glob patterns matched against member names. Members
+        already on disk with the same size and CRC are skipped, and the rest
+        are decompressed on a worker pool.
+        """
+        import zipfile
+
+        name = name or Path(zip_path).name
+        extract_to = Path(extract_to)
+        started = time.monotonic()
+        try:
+            if not quiet:
+                self.print_info(f"Extracting {name}...")
             with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_to)
-            self.print_success(f"Extracted to {extract_to}")
+                members = [info for info in zip_ref.infolist()
+                           if self._member_selected(info.filename, include, exclude)]
+                pending = []
+                for info in members:
+                    target = self._member_target(extract_to, info.filename)
+                    if info.is_dir():
+                        target.mkdir(parents=True, exist_ok=True)
+                    elif not self._member_unchanged(info, target):
+                        pending.append((info, target))
+
+                # Each worker gets its own handle on a path; a buffer is shared,
+                # ZipFile serialises the reads and decompression runs in parallel
+                local = threading.local()
+                opened = []
+
+                def extract_member(item):
+                    info, target = item
+                    handle = getattr(local, 'zip', None)
+                    if handle is None:
+                        handle = zip_ref
+                        if isinstance(zip_path, (str, Path)):
+                            handle = zipfile.ZipFile(zip_path)
+                            opened.append(handle)
+                        local.zip = handle
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    with handle.open(info) as source, open(target, 'wb') as dest:
+                        shutil.copyfileobj(source, dest, 1024**2)
+
+                try:
+                    with ThreadPoolExecutor(max_workers=self.extract_workers) as pool:
+                        list(pool.map(extract_member, pending))
+                finally:
+                    for handle in opened:
+                        handle.close()
+                    self.add_metric('disk_seconds', time.monotonic() - started)
+            self.add_metric('bytes_extracted', sum(info.file_size for info, _ in pending))
+            self._index_entry_points(extract_to, [info.filename for info in members])
+            if not quiet:
+                skipped = len(members) - len(pending)
+                self.print_success(f"Extracted to {extract_to}" + (f" ({skipped} entries unchanged)" if skipped else ""))
             return True
         except Exception as e:
-            self.print_error(f"Failed to extract: {str(e)}")
+            self.download_errors[name] = f"extraction failed: {str(e)}"
+            if not quiet:
+                self.print_error(f"Failed to extract: {str(e)}")
+            return False
+
+    def _index_entry_points(self, root, member_names):
+        """Record where the well-known entry points of an archive were extracted"""
+        entries = {}
+        for member in member_names:
+            parts = [part for part in member.replace('\\', '/').split('/') if part]
+            for depth, part in enumerate(parts):
+                if part in self.entry_points and part not in entries:
+                    entries[part] = '/'.join(parts[:depth + 1])
+        self._update_artifact_index(root, entries)
+
+    def _update_artifact_index(self, root, entries):
+        with self._index_lock:
+            index = self._load_json(self.state_path / "artifact-index.json")
+            index[str(Path(root))] = entries
+            self._write_json_atomic(self.state_path / "artifact-index.json", index)
+
+    def find_entry_point(self, root, name):
+        """Locate name under root via the artifact index, walking the tree only if it is stale"""
+        root = Path(root)
+        relative = self._load_json(self.state_path / "artifact-index.json").get(str(root), {}).get(name)
+        if relative and (root / relative).exists():
+            return root / relative
+        if not root.exists():
+            return None
+
+        match = next(root.rglob(name), None)
+        if match:
+            with self._index_lock:
+                entries = self._load_json(self.state_path / "artifact-index.json").get(str(root), {})
+            entries[name] = match.relative_to(root).as_posix()
+            self._update_artifact_index(root, entries)
+        return match
+
+    def is_installed(self, root, name):
+        """Menu status check that only consults the artifact index"""
+        return name in self._load_json(self.state_path / "artifact-index.json").get(str(Path(root)), {})
+
+    def _member_selected(self, member, include, exclude):
+        """Apply include/exclude glob filters to a ZIP member name"""
+        if include and not any(fnmatch.fnmatch(member, pattern) for pattern in include):
             return False
+        return not any(fnmatch.fnmatch(member, pattern) for pattern in exclude or ())
 
+    def _member_target(self, extract_to, member):
+        """Destination path of a ZIP member, with absolute and '..' parts dropped"""
+        parts = [part for part in member.replace('\\', '/').split('/') if part not in ('', '.', '..')]
+        if parts:
+            parts[0] = os.path.splitdrive(parts[0])[1] or '_'
+        return extract_to.joinpath(*parts)
+
+    def _member_unchanged(self, info, target):
+        """True if target already holds the member's contents (size + CRC-32)"""
+        import zlib
+
+        try:
+            if target.stat().st_size != info.file_size:
+                return False
+            crc = 0
+            with open(target, 'rb') as f:
+                for block in iter(lambda: f.read(1024**2), b''):
+                    crc = zlib.crc32(block, crc)
+            return crc == info.CRC
+        except OSError:
+            return False
+
+    @timed_step
     def download_opcore_simplify(self):
         """Download and extract OpenCore Simplify"""
         self.print_header("DOWNLOADING OPENCORE SIMPLIFY")
         
         extract_path = self.desktop_path / "OpenCore-Simplify"
-        
-        if extract_path.exists():
-            self.print_warning(f"OpenCore-Simplify already exists at {extract_path}")
-            choice = input("Overwrite? (Y/N): ").upper()
-            if choice != 'Y':
-                self.print_info("Skipping OpenCore Simplify download")
-                return extract_path
-
-        zip_path = self.download_file(
+
+        result = self.fetch_archive(
             self.app_data['opcore_url'],
             self.downloads_path,
-            "OpCore-Simplify.zip"
+            "OpCore-Simplify.zip",
+            extract_path
         )
-        
-        if zip_path and self.extract_zip(zip_path, extract_path):
-            return extract_path
-        return None
+        if result and self.download_status.get("OpCore-Simplify.zip") in ('up to date', 'cached'):
+            self.print_success(f"OpenCore-Simplify is up to date at {extract_path}")
+        return result
 
+    @timed_step
     def run_opcore_simplify(self, opcore_path):
         """Guide user through OpenCore Simplify process"""
+        import subprocess
+
         self.print_header("RUNNING OPENCORE SIMPLIFY")
         
-        bat_file = list(opcore_path.rglob("OpCore-Simplify.bat"))
+        bat_file = self.find_entry_point(opcore_path, "OpCore-Simplify.bat")
         if not bat_file:
             self.print_error("OpCore-Simplify.bat not found")
             return False
 
-        bat_path = bat_file[0].parent
+        bat_path = bat_file.parent
         self.print_info(f"Opening command prompt in {bat_path}")
         self.print_info("Follow the on-screen prompts:")
         self.print_info("1. When prompted 'Skip update?': Type N, press Enter")
@@ -233,17 +1901,18 @@ class MacOSInstaller:
         self.print_info("6. Type 6 to build EFI")
         self.print_info("7. Wait for completion and copy EFI folder to Desktop")
 
-        input("\nPress Enter when ready to launch OpenCore Simplify...")
+        self.prompt("\nPress Enter when ready to launch OpenCore Simplify...")
         
         try:
             subprocess.Popen(f'start cmd /k "cd /d {bat_path} && OpCore-Simplify.bat"', shell=True)
             self.print_info("OpenCore Simplify launched. Wait for completion...")
-            input("Press Enter after OpenCore Simplify completes and EFI is generated...")
+            self.prompt("Press Enter after OpenCore Simplify completes and EFI is generated...")
             return True
         except Exception as e:
             self.print_error(f"Failed to launch: {str(e)}")
             return False
 
+    @timed_step
     def download_usb_tools(self):
         """Download USBToolBox and Kexts"""
         self.print_header("DOWNLOADING USB TOOLS")
@@ -251,25 +1920,10 @@ class MacOSInstaller:
         usb_folder = self.desktop_path / "USBTools"
         usb_folder.mkdir(exist_ok=True)
 
-        # Download USBToolBox.exe
-        self.download_file(
-            self.app_data['usbtoolbox_url'],
-            usb_folder,
-            "USBToolBox.exe"
-        )
-
-        # Download USBToolBox kexts
-        kext_zip = self.download_file(
-            self.app_data['usbtoolbox_kext_url'],
-            usb_folder,
-            "USBToolBox-Kexts.zip"
-        )
-
-        if kext_zip:
-            self.extract_zip(kext_zip, usb_folder / "Kexts")
-
+        self.download_tools(['usbtoolbox_url', 'usbtoolbox_kext_url'])
         return usb_folder
 
+    @timed_step
     def download_additional_tools(self):
         """Download OCAuxiliaryTools, OpenCorePkg, and Rufus"""
         self.print_header("DOWNLOADING ADDITIONAL TOOLS")
@@ -277,80 +1931,449 @@ class MacOSInstaller:
         tools_folder = self.desktop_path / "MacOSTools"
         tools_folder.mkdir(exist_ok=True)
 
-        # OCAuxiliaryTools
-        ocat_zip = self.download_file(
-            self.app_data['ocat_url'],
-            tools_folder,
-            "OCAT.zip"
-        )
-        if ocat_zip:
-            self.extract_zip(ocat_zip, tools_folder / "OCAuxiliaryTools")
-
-        # OpenCorePkg
-        opencore_zip = self.download_file(
-            self.app_data['opencore_url'],
-            tools_folder,
-            "OpenCorePkg.zip"
-        )
-        if opencore_zip:
-            self.extract_zip(opencore_zip, tools_folder / "OpenCorePkg")
-
-        # Rufus
-        self.download_file(
-            self.app_data['rufus_url'],
-            tools_folder,
-            "Rufus.exe"
-        )
-
+        self.download_tools(['ocat_url', 'opencore_url', 'rufus_url'])
         return tools_folder
 
-    def download_macrecovery(self, macos_version="sequoia"):
-        """Download macOS recovery image"""
+    @timed_step
+    def download_all_tools(self, keys=None):
+        """Download USB tools and additional tools (or only keys) in a single concurrent batch.
+
+        Returns None if any of them failed.
+        """
+        self.print_header("DOWNLOADING USB & ADDITIONAL TOOLS")
+
+        keys = keys or list(self.tool_artifacts)
+        results = self.download_tools(keys)
+        if not all(results.get(key) for key in keys):
+            return None
+        return self.desktop_path / "USBTools", self.desktop_path / "MacOSTools"
+
+    def _tool_paths(self, keys):
+        """Files and extract folders the given tool artifacts produce"""
+        paths = []
+        for key in keys:
+            folder, filename, extract_to = self.tool_artifacts[key]
+            paths.append(self.desktop_path / folder / filename)
+            if extract_to:
+                paths.append(self.desktop_path / folder / extract_to)
+        return paths
+
+    @timed_step
+    def download_opencorepkg(self):
+        """Download OpenCorePkg on its own; the macrecovery.py fallback needs nothing else"""
+        return self.download_tools(['opencore_url']).get('opencore_url')
+
+    @timed_step
+    def download_macrecovery(self, macos_version="sequoia", background=False):
+        """Download macOS recovery image.
+
+        The image is fetched in-process from Apple's recovery service, with the
+        DMG and chunklist downloading side by side and resuming after an
+        interruption. The DMG is verified against its chunklist, only failed
+        chunks are re-fetched, and verified images are kept per version in
+        recovery_store_path for reuse. If that fails, OpenCorePkg's macrecovery.py is run with
+        its progress streamed. With background=True the download runs on a
+        worker thread and the menu stays usable; see recovery_status().
+        """
         self.print_header("DOWNLOADING MACOS RECOVERY IMAGE")
         
         recovery_folder = self.desktop_path / "macOS_Recovery"
         recovery_folder.mkdir(exist_ok=True)
 
-        macos_versions = {
-            'sequoia': ('Mac-7BA5B2DFE22DDD8C', '00000000000KXPG00'),
-            'sonoma': ('Mac-937A206F2EE63C01', '00000000000LYNZA00'),
-            'ventura': ('Mac-FFE5EF870D7BA81A', '00000000000TYFG0'),
-            'monterey': ('Mac-94245B3640C91DA7', '00000000000GMT0A00'),
-        }
-
-        if macos_version.lower() not in macos_versions:
+        if macos_version.lower() not in self.macos_versions:
             self.print_error(f"Unknown macOS version: {macos_version}")
             return None
 
-        board_id, mlb = macos_versions[macos_version.lower()]
-        
-        macrecovery_script = list((self.desktop_path / "MacOSTools" / "OpenCorePkg").rglob("macrecovery.py"))
-        
-        if not macrecovery_script:
-            self.print_error("macrecovery.py not found. Download OpenCorePkg first.")
+        if background:
+            if self.recovery_job and self.recovery_job['thread'].is_alive():
+                self.print_warning(f"A {self.recovery_job['version']} recovery download is already running")
+                return None
+            job = {'version': macos_version.lower(), 'status': 'running', 'files': [], 'result': None}
+            job['thread'] = threading.Thread(target=self._run_recovery_job, args=(job, recovery_folder), daemon=True)
+            self.recovery_job = job
+            job['thread'].start()
+            self.print_info(f"{macos_version.capitalize()} recovery image is downloading in the background")
+            self.print_info("Its progress is shown in the main menu")
             return None
 
-        script_path = macrecovery_script[0].parent
-        
         self.print_info(f"Downloading {macos_version.capitalize()} recovery image...")
         self.print_info("This may take 10-30 minutes depending on internet speed...")
-        
-        cmd = f'python "{macrecovery_script[0]}" -b {board_id} -m {mlb} download'
-        
+        job = {'version': macos_version.lower(), 'status': 'running', 'files': [], 'result': None}
+        self._run_recovery_job(job, recovery_folder, quiet=False)
+        if job['result']:
+            self.print_success(f"Recovery image downloaded to {job['result']}")
+        else:
+            self.print_error(f"Failed to download recovery image: {job.get('error', 'unknown error')}")
+        return job['result']
+
+    def recovery_status(self):
+        """One-line status of the background recovery download, or None"""
+        job = self.recovery_job
+        if not job:
+            return None
+        if job['status'] == 'running':
+            downloaded, total_size = self.progress_of(job['files'])
+            if total_size:
+                return f"{job['version']}: downloading {(downloaded / total_size) * 100:.0f}%"
+            return f"{job['version']}: downloading"
+        if job['status'] == 'done':
+            return f"{job['version']}: ready"
+        return f"{job['version']}: failed ({job.get('error', 'unknown error')})"
+
+    def _run_recovery_job(self, job, recovery_folder, quiet=True):
+        board_id, mlb = self.macos_versions[job['version']]
+        outdir = recovery_folder / "com.apple.recovery.boot"
         try:
-            subprocess.run(cmd, shell=True, cwd=str(script_path), check=True)
-            self.print_success("Recovery image downloaded")
-            return script_path / "com.apple.recovery.boot"
+            job['result'] = self._download_recovery_direct(job, board_id, mlb, outdir, quiet)
         except Exception as e:
-            self.print_error(f"Failed to download recovery image: {str(e)}")
+            self.log(f"Direct recovery download failed, falling back to macrecovery.py: {str(e)}",
+                     "WARNING", echo=not quiet)
+            try:
+                job['result'] = self._run_macrecovery_script(job, board_id, mlb, outdir, quiet)
+                if not self.ingest_recovery_image(job['version'], outdir):
+                    self.log("macrecovery.py image could not be verified against its chunklist",
+                             "WARNING", echo=not quiet)
+            except Exception as e:
+                job['error'] = str(e)
+        job['status'] = 'done' if job['result'] else 'failed'
+        self.log(f"Recovery download ({job['version']}): {job['status']}", echo=False)
+
+    def _recovery_image_info(self, board_id, mlb):
+        """Ask osrecovery.apple.com for the recovery image and chunklist links.
+
+        This is the same exchange macrecovery.py performs: fetch a session
+        cookie, then post the board id and MLB to get asset URLs and tokens.
+        """
+        import secrets
+
+        headers = {'Host': 'osrecovery.apple.com', 'Connection': 'close', 'User-Agent': 'InternetRecovery/1.0'}
+        response = self.get_session().get('http://osrecovery.apple.com/', headers=headers, timeout=self.http_timeout)
+        session_cookie = response.cookies.get('session')
+        if not session_cookie:
+            raise IOError("No session cookie from osrecovery.apple.com")
+
+        post = {
+            'cid': secrets.token_hex(8).upper(),
+            'sn': mlb,
+            'bid': board_id,
+            'k': secrets.token_hex(32).upper(),
+            'fg': secrets.token_hex(32).upper(),
+            'os': 'default',
+        }
+        response = self.get_session().post(
+            'http://osrecovery.apple.com/InstallationPayload/RecoveryImage',
+            data='\n'.join(f"{key}={value}" for key, value in post.items()),
+            headers=dict(headers, Cookie=f"session={session_cookie}", **{'Content-Type': 'text/plain'}),
+            timeout=self.http_timeout,
+        )
+        response.raise_for_status()
+        info = {}
+        for line in response.text.splitlines():
+            key, _, value = line.partition(': ')
+            info[key] = value
+        if not info.get('AU') or not info.get('CU'):
+            raise IOError("Recovery service returned no image link")
+        return info
+
+    def _download_recovery_direct(self, job, board_id, mlb, outdir, quiet):
+        store = self.recovery_store_path / job['version'] / "com.apple.recovery.boot"
+        if self._recovery_store_valid(store):
+            self.log(f"Using verified {job['version']} recovery image from {store}", echo=not quiet)
+            return self._stage_recovery(store, outdir)
+        if self._recovery_from_bundle(job, store, quiet):
+            return self._stage_recovery(store, outdir)
+
+        info = self._recovery_image_info(board_id, mlb)
+        jobs = {}
+        for link, token in (('AU', 'AT'), ('CU', 'CT')):
+            url = info[link]
+            jobs[link] = {
+                'url': url,
+                'destination': store,
+                'filename': url.split('?')[0].split('/')[-1],
+                'headers': {'User-Agent': 'InternetRecovery/1.0', 'Cookie': f"AssetToken={info[token]}"},
+                'use_cache': False,
+            }
+        dmg_path = store / jobs['AU']['filename']
+        chunklist_path = store / jobs['CU']['filename']
+        job['files'] = [jobs['AU']['filename'], jobs['CU']['filename']]
+
+        # An image left in the store by an earlier run is repaired, not re-fetched
+        if dmg_path.exists():
+            del jobs['AU']
+        results = self.download_parallel(jobs, max_workers=2, render=not quiet)
+        failed = [jobs[link]['filename'] for link, path in results.items() if not path]
+        if failed:
+            raise IOError(f"Failed to download {', '.join(failed)}: "
+                          f"{self.download_errors.get(failed[0], 'download failed')}")
+
+        chunks = self.parse_chunklist(chunklist_path)
+        bad = self.verify_chunks(dmg_path, chunks)
+        if bad:
+            self.log(f"{len(bad)} of {len(chunks)} chunks of {dmg_path.name} need re-downloading", echo=not quiet)
+            self._repair_chunks(info['AU'], {'User-Agent': 'InternetRecovery/1.0', 'Cookie': f"AssetToken={info['AT']}"},
+                                dmg_path, chunks, bad)
+            bad = self.verify_chunks(dmg_path, chunks, only=bad)
+            if bad:
+                raise IOError(f"{len(bad)} chunks of {dmg_path.name} failed verification after re-download")
+
+        self._mark_recovery_verified(store, dmg_path, chunklist_path)
+        return self._stage_recovery(store, outdir)
+
+    def _recovery_from_bundle(self, job, store, quiet):
+        """Fill the store from the offline bundle or mirror, if it has this version"""
+        if not (self.bundle_path or self.mirror_url):
+            return False
+        entry = self._load_bundle_index().get('recovery', {}).get(job['version'])
+        if not entry:
+            return False
+        job['files'] = [entry['dmg']['name'], entry['chunklist']['name']]
+        self.track_progress(job['files'], render=not quiet and self.render_progress)
+        try:
+            for part in ('dmg', 'chunklist'):
+                self._fetch_bundle_file(entry[part], store / entry[part]['name'], quiet)
+        finally:
+            self.untrack_progress(job['files'])
+        dmg_path, chunklist_path = store / entry['dmg']['name'], store / entry['chunklist']['name']
+        if self.verify_chunks(dmg_path, self.parse_chunklist(chunklist_path)):
+            raise IOError(f"{dmg_path.name} from the offline bundle failed chunklist verification")
+        self._mark_recovery_verified(store, dmg_path, chunklist_path)
+        self.log(f"{job['version']} recovery image taken from the offline bundle", echo=not quiet)
+        return True
+
+    def parse_chunklist(self, path):
+        """Read an Apple chunklist: a list of (offset, size, sha256) per DMG chunk"""
+        import struct
+
+        with open(path, 'rb') as f:
+            header = f.read(36)
+            magic, _, _, _, _, chunk_count, chunk_offset, _ = struct.unpack('<4sIBBBxQQQ', header)
+            if magic != b'CNKL':
+                raise IOError(f"{Path(path).name} is not a chunklist")
+            f.seek(chunk_offset)
+            chunks, offset = [], 0
+            for _ in range(chunk_count):
+                size, digest = struct.unpack('<I32s', f.read(36))
+                chunks.append((offset, size, digest))
+                offset += size
+        return chunks
+
+    def verify_chunks(self, dmg_path, chunks, only=None):
+        """Stream the DMG against its chunklist and return the indices of bad chunks"""
+        bad = []
+        indices = range(len(chunks)) if only is None else only
+        with open(dmg_path, 'rb') as f:
+            for index in indices:
+                offset, size, digest = chunks[index]
+                f.seek(offset)
+                data = f.read(size)
+                if len(data) != size or hashlib.sha256(data).digest() != digest:
+                    bad.append(index)
+        return bad
+
+    def _repair_chunks(self, url, headers, dmg_path, chunks, bad):
+        """Re-fetch only the listed chunks with range requests and write them in place"""
+        total_size = chunks[-1][0] + chunks[-1][1]
+        with open(dmg_path, 'r+b') as f:
+            if f.seek(0, os.SEEK_END) != total_size:
+                f.truncate(total_size)
+
+        def fetch_chunk(index):
+            offset, size, _ = chunks[index]
+
+            def attempt():
+                response = self.http_get(url, headers=dict(headers, Range=f'bytes={offset}-{offset + size - 1}'))
+                response.raise_for_status()
+                if response.status_code != 206 or len(response.content) != size:
+                    raise IOError("Server did not honour the chunk range request")
+                return response.content
+
+            data = self._retry(attempt, dmg_path.name, quiet=True)
+            self.throttle(dmg_path.name, size)
+            with open(dmg_path, 'r+b') as f:
+                f.seek(offset)
+                f.write(data)
+
+        with ThreadPoolExecutor(max_workers=self.download_segments) as pool:
+            list(pool.map(fetch_chunk, bad))
+
+    def _recovery_store_valid(self, store):
+        """True if the store holds an image verified earlier and unchanged since"""
+        marker = self._load_json(store / "verified.json")
+        try:
+            dmg = (store / marker['dmg']).stat()
+            return dmg.st_size == marker['size'] and dmg.st_mtime_ns == marker['mtime_ns'] \
+                and (store / marker['chunklist']).exists()
+        except (KeyError, OSError):
+            return False
+
+    def _mark_recovery_verified(self, store, dmg_path, chunklist_path):
+        # Chunk repairs change the image after download_file recorded it, so
+        # the manifest entries are refreshed once the image has verified
+        manifest = self.load_manifest(store)
+        for path in (dmg_path, chunklist_path):
+            self.record_manifest(manifest.get(path.name, {}).get('url'), path, None)
+        stat = dmg_path.stat()
+        (store / "verified.json").write_text(json.dumps({
+            'dmg': dmg_path.name,
+            'chunklist': chunklist_path.name,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'verified': datetime.now().isoformat(timespec='seconds'),
+        }, indent=2))
+
+    def _stage_recovery(self, store, outdir):
+        """Link the verified image files from the store into outdir, with their manifest entries"""
+        marker = self._load_json(store / "verified.json")
+        outdir.mkdir(parents=True, exist_ok=True)
+        store_manifest = self.load_manifest(store)
+        manifest = self.load_manifest(outdir)
+        for name in (marker['dmg'], marker['chunklist']):
+            self._place_file(store / name, outdir / name)
+            if name in store_manifest:
+                manifest[name] = store_manifest[name]
+            else:
+                manifest.pop(name, None)
+        self._write_json_atomic(outdir / "manifest.json", manifest, indent=2)
+        return outdir
+
+    def ingest_recovery_image(self, version, folder):
+        """Verify a recovery image downloaded elsewhere and add it to the store"""
+        folder = Path(folder)
+        for chunklist_path in folder.glob("*.chunklist"):
+            dmg_path = chunklist_path.with_suffix(".dmg")
+            if not dmg_path.exists() or self.verify_chunks(dmg_path, self.parse_chunklist(chunklist_path)):
+                continue
+            store = self.recovery_store_path / version / "com.apple.recovery.boot"
+            store.mkdir(parents=True, exist_ok=True)
+            for path in (dmg_path, chunklist_path):
+                self._place_file(path, store / path.name)
+            self._mark_recovery_verified(store, store / dmg_path.name, store / chunklist_path.name)
+            return True
+        return False
+
+    def _run_macrecovery_script(self, job, board_id, mlb, outdir, quiet):
+        """Run OpenCorePkg's macrecovery.py, streaming its progress into the job"""
+        import subprocess
+
+        script = self.find_entry_point(self.desktop_path / "MacOSTools" / "OpenCorePkg", "macrecovery.py")
+        if not script:
+            raise IOError("macrecovery.py not found. Download OpenCorePkg first.")
+
+        job['files'] = ['macrecovery.py']
+        self.track_progress(job['files'], render=False)
+        try:
+            process = subprocess.Popen(
+                [sys.executable, str(script), '-b', board_id, '-m', mlb, '-o', str(outdir), 'download'],
+                cwd=str(script.parent), stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            )
+            line, progress_shown = b'', False
+            # macrecovery.py redraws its progress with '\r', so split on both
+            for byte in iter(lambda: process.stdout.read(1), b''):
+                if byte not in (b'\r', b'\n'):
+                    line += byte
+                    continue
+                text = line.decode(errors='replace').strip()
+                line = b''
+                match = re.search(r'(\d+(?:\.\d+)?)%', text)
+                if match:
+                    self.report_progress('macrecovery.py', float(match.group(1)), 100)
+                    if not quiet:
+                        print(f"\rProgress: {float(match.group(1)):.1f}%", end='')
+                        progress_shown = True
+                elif text:
+                    if progress_shown:
+                        print()
+                        progress_shown = False
+                    self.log(f"macrecovery: {text}", echo=not quiet)
+            if process.wait() != 0:
+                raise IOError(f"macrecovery.py exited with status {process.returncode}")
+        finally:
+            self.untrack_progress(job['files'])
+        return outdir
+
+    def link_tree(self, source, target):
+        """Mirror a folder into target with hardlinks, copying where linking fails"""
+        source, target = Path(source), Path(target)
+        linked = 0
+        for path in source.rglob('*'):
+            if not path.is_file():
+                continue
+            dest = target / path.relative_to(source)
+            if dest.exists() and os.path.samefile(path, dest):
+                continue
+            self._place_file(path, dest)
+            linked += 1
+        return linked
+
+    @timed_step
+    def prepare_targets(self, targets, keys=None):
+        """Prepare payloads for several machines, fetching every artifact once.
+
+        targets is a list of (macos_version, output_dir) pairs. The shared tool
+        artifacts are downloaded once into desktop_path and each distinct macOS
+        version once into the recovery store; every output_dir is then staged
+        with hardlinks to those files rather than copies.
+        """
+        targets = [(version.lower(), Path(output_dir).expanduser()) for version, output_dir in targets]
+        unknown = sorted({version for version, _ in targets if version not in self.macos_versions})
+        if unknown:
+            self.print_error(f"Unknown macOS version: {', '.join(unknown)}")
             return None
 
+        versions = sorted({version for version, _ in targets})
+        self.print_header(f"PREPARING {len(targets)} TARGET{'S' if len(targets) != 1 else ''} ({', '.join(versions)})")
+        keys = keys or list(self.tool_artifacts)
+        tools = self.download_tools(keys)
+
+        # Each version is fetched once into the store; later targets only link it
+        recovery = {}
+        for version in versions:
+            outdir = next(path for v, path in targets if v == version) / "macOS_Recovery"
+            self.print_info(f"Fetching {version.capitalize()} recovery image...")
+            job = {'version': version, 'status': 'running', 'files': [], 'result': None}
+            self._run_recovery_job(job, outdir, quiet=False)
+            recovery[version] = job['result']
+            if not job['result']:
+                self.print_error(f"{version.capitalize()} recovery image: {job.get('error', 'download failed')}")
+
+        folders = sorted({self.tool_artifacts[key][0] for key in keys if tools.get(key)})
+        status = {}
+        for version, output_dir in targets:
+            linked = 0
+            for folder in folders:
+                linked += self.link_tree(self.desktop_path / folder, output_dir / folder)
+            staged = None
+            if recovery[version]:
+                store = self.recovery_store_path / version / "com.apple.recovery.boot"
+                outdir = output_dir / "macOS_Recovery" / "com.apple.recovery.boot"
+                if self._recovery_store_valid(store):
+                    staged = self._stage_recovery(store, outdir)
+                else:
+                    self.link_tree(recovery[version], outdir)
+                    staged = outdir
+            status[str(output_dir)] = {
+                'macos_version': version,
+                'tools': [key for key in keys if tools.get(key)],
+                'recovery': str(staged) if staged else None,
+            }
+            self.print_success(f"{output_dir}: {version.capitalize()}, {linked} files linked"
+                               + ("" if staged else ", recovery image missing"))
+        return status
+
+    def targets_complete(self, prepared, keys=None):
+        """True if every prepared target has its recovery image and all tool artifacts in keys"""
+        keys = set(keys or self.tool_artifacts)
+        return bool(prepared) and all(target['recovery'] and keys <= set(target['tools'])
+                                      for target in prepared.values())
+
+    @timed_step
     def format_usb_guide(self):
         """Guide user through USB formatting"""
         self.print_header("USB FORMATTING GUIDE")
         
         self.print_warning("IMPORTANT: All data on the USB drive will be erased!")
-        input("Insert USB drive and press Enter to continue...")
+        self.prompt("Insert USB drive and press Enter to continue...")
         
         self.print_info("Instructions:")
         self.print_info("1. Open Rufus.exe from Desktop/MacOSTools")
@@ -362,23 +2385,146 @@ class MacOSInstaller:
         self.print_info("4. Click 'Start' and confirm")
         self.print_info("5. Wait for completion")
         
-        input("Press Enter after USB formatting is complete...")
+        self.prompt("Press Enter after USB formatting is complete...")
         return True
 
-    def copy_files_to_usb(self):
-        """Guide copying files to USB"""
+    @timed_step
+    def copy_files_to_usb(self, usb_path=None):
+        """Copy the EFI folder and recovery image to the USB drive"""
         self.print_header("COPYING FILES TO USB")
-        
-        self.print_info("You will now copy files to the USB drive")
-        self.print_info("1. Open File Explorer")
-        self.print_info("2. Navigate to Desktop/EFI folder")
-        self.print_info("3. Copy the entire EFI folder to USB root (e.g., E:\\EFI)")
-        self.print_info("4. Navigate to macOS_Recovery folder (if you downloaded recovery image)")
-        self.print_info("5. Copy contents to USB root next to EFI folder")
-        
-        input("Press Enter after files are copied to USB...")
-        return True
 
+        usb_path = usb_path or self.usb_path or self.prompt(
+            "Enter the USB drive path (e.g., E:\\) or leave empty to copy by hand: ").strip()
+        if not usb_path:
+            self.print_info("You will now copy files to the USB drive")
+            self.print_info("1. Open File Explorer")
+            self.print_info("2. Navigate to Desktop/EFI folder")
+            self.print_info("3. Copy the entire EFI folder to USB root (e.g., E:\\EFI)")
+            self.print_info("4. Navigate to macOS_Recovery folder (if you downloaded recovery image)")
+            self.print_info("5. Copy contents to USB root next to EFI folder")
+
+            self.prompt("Press Enter after files are copied to USB...")
+            return True
+
+        usb_path = Path(usb_path)
+        if not usb_path.is_dir():
+            self.print_error(f"USB drive not found at {usb_path}")
+            return False
+        sources = [
+            (self.desktop_path / "EFI", usb_path / "EFI"),
+            (self.desktop_path / "macOS_Recovery" / "com.apple.recovery.boot", usb_path / "com.apple.recovery.boot"),
+        ]
+        ok = True
+        for source, target in sources:
+            if not source.is_dir():
+                self.print_warning(f"{source} not found, skipping")
+                continue
+            try:
+                copied, skipped, size = self.copy_tree(source, target)
+                self.print_success(f"{source.name}: {copied} files copied ({size / 1024**2:.1f} MB), "
+                                   f"{skipped} unchanged, all verified")
+            except Exception as e:
+                self.print_error(f"Copying {source.name} failed: {str(e)}")
+                ok = False
+        return ok
+
+    def copy_tree(self, source, target):
+        """Copy a folder to target (any directory, e.g. a USB drive) and verify it.
+
+        Files are copied on a worker pool with large buffered reads, hashing the
+        source on the way; files already at the target with the same size and
+        hash are left alone. The written files are flushed to the target once at
+        the end, then re-read and compared with the source hashes (from the
+        device where the OS lets us drop its cache, see _sync_files). Sources
+        listed in a manifest.json must match it. Returns (copied, skipped, bytes copied).
+        """
+        source, target = Path(source), Path(target)
+        started = time.monotonic()
+        files = []
+        for path in source.rglob('*'):
+            dest = target / path.relative_to(source)
+            if path.is_dir():
+                dest.mkdir(parents=True, exist_ok=True)
+            elif path.is_file():
+                files.append((path, dest))
+        target.mkdir(parents=True, exist_ok=True)
+        manifests = {folder: self.load_manifest(folder) for folder in {path.parent for path, _ in files}}
+
+        def copy_one(path, dest):
+            size = path.stat().st_size
+            if dest.exists() and dest.stat().st_size == size:
+                sha256 = self._hash_file(path)
+                copied = self._hash_file(dest) != sha256
+                if copied:
+                    self._copy_file(path, dest)
+            else:
+                sha256, copied = self._copy_file(path, dest), True
+            if self.verify_file(path, sha256, manifests[path.parent]) is False:
+                raise IOError(f"{path} does not match its manifest")
+            return sha256, copied, size
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.copy_workers) as executor:
+            futures = {executor.submit(copy_one, path, dest): dest for path, dest in files}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+
+        written = [dest for dest, (_, copied, _) in results.items() if copied]
+        self._sync_files(written)
+        with ThreadPoolExecutor(max_workers=self.copy_workers) as executor:
+            hashes = dict(zip(written, executor.map(self._hash_file, written)))
+        copied_bytes = sum(results[dest][2] for dest in written)
+        self.add_metric('bytes_copied', copied_bytes)
+        self.add_metric('disk_seconds', time.monotonic() - started)
+        bad = [dest.name for dest in written if hashes[dest] != results[dest][0]]
+        if bad:
+            raise IOError(f"Verification failed for {', '.join(sorted(bad))}")
+        self.log(f"Copied {source} to {target}: {len(written)} files written, "
+                 f"{len(results) - len(written)} unchanged", echo=False)
+        return len(written), len(results) - len(written), copied_bytes
+
+    def _copy_file(self, source, target):
+        """Copy one file through a reusable buffer, returning the SHA-256 of the data"""
+        sha256 = hashlib.sha256()
+        buffer = bytearray(self.copy_buffer_size)
+        view = memoryview(buffer)
+        with open(source, 'rb') as src, open(target, 'wb') as dst:
+            while True:
+                read = src.readinto(buffer)
+                if not read:
+                    break
+                sha256.update(view[:read])
+                dst.write(view[:read])
+        return sha256.hexdigest()
+
+    def _sync_files(self, paths):
+        """Flush the written files and their folders to the target device, after all copies are done.
+
+        Where posix_fadvise exists (Linux), the files' cached pages are dropped
+        after the flush, so the verification that follows re-reads them from
+        the device. Elsewhere it may be served from the OS cache and only
+        proves the copy itself; a failed device write then surfaces as an
+        fsync error.
+        """
+        folders = set()
+        for path in paths:
+            with open(path, 'r+b') as f:
+                os.fsync(f.fileno())
+                if hasattr(os, 'posix_fadvise'):
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+            folders.add(Path(path).parent)
+        if os.name == 'nt':
+            return  # Windows cannot open folders for fsync; NTFS/FAT metadata is flushed with the files
+        for folder in folders:
+            fd = os.open(folder, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            except OSError:
+                pass  # Some filesystems (e.g. FAT on older kernels) reject fsync on folders
+            finally:
+                os.close(fd)
+
+    @timed_step
     def partition_disk_guide(self):
         """Guide user through disk partitioning"""
         self.print_header("DISK PARTITIONING GUIDE")
@@ -395,9 +2541,10 @@ class MacOSInstaller:
         self.print_info("7. Format as exFAT, label 'macOS'")
         self.print_info("8. Click 'Next' > 'Finish'")
         
-        input("Press Enter after partition is created...")
+        self.prompt("Press Enter after partition is created...")
         return True
 
+    @timed_step
     def bios_configuration_guide(self):
         """Guide BIOS configuration"""
         self.print_header("BIOS CONFIGURATION GUIDE")
@@ -412,9 +2559,10 @@ class MacOSInstaller:
         self.print_info("6. Save and Exit (usually F10 then Yes)")
         self.print_info("7. Insert USB drive and restart")
         
-        input("Press Enter after BIOS is configured and USB is inserted...")
+        self.prompt("Press Enter after BIOS is configured and USB is inserted...")
         return True
 
+    @timed_step
     def installation_guide(self):
         """Guide macOS installation process"""
         self.print_header("MACOS INSTALLATION GUIDE")
@@ -439,9 +2587,10 @@ class MacOSInstaller:
         self.print_info("13. System will restart multiple times (3-4 phases)")
         self.print_info("14. Complete setup wizard (language, region, Wi-Fi, Apple ID)")
         
-        input("Press Enter to start installation...")
+        self.prompt("Press Enter to start installation...")
         return True
 
+    @timed_step
     def post_installation_guide(self):
         """Guide post-installation steps"""
         self.print_header("POST-INSTALLATION STEPS")
@@ -465,9 +2614,10 @@ class MacOSInstaller:
         self.print_info("   - Restart")
         self.print_info("   - You'll now see OpenCore boot menu on every restart")
         
-        input("Press Enter after post-installation is complete...")
+        self.prompt("Press Enter after post-installation is complete...")
         return True
 
+    @timed_step
     def troubleshooting_guide(self):
         """Troubleshooting guide"""
         self.print_header("TROUBLESHOOTING GUIDE")
@@ -525,7 +2675,7 @@ class MacOSInstaller:
             print(f"{key}. {value['issue']}")
         print("0. Go back")
         
-        choice = input("\nEnter choice: ").strip()
+        choice = self.prompt("\nEnter choice: ").strip()
         
         if choice in issues:
             issue_data = issues[choice]
@@ -540,13 +2690,19 @@ class MacOSInstaller:
         self.clear_screen()
         self.print_header("MACOS HACKINTOSH INSTALLER FOR WINDOWS")
         
+        installed = f" {Colors.OKGREEN}[installed]{Colors.ENDC}"
+        opcore = installed if self.is_installed(self.desktop_path / "OpenCore-Simplify", "OpCore-Simplify.bat") else ""
+        usb = installed if self.is_installed(self.desktop_path / "USBTools" / "Kexts", "USBToolBox.kext") else ""
+        tools = installed if self.is_installed(self.desktop_path / "MacOSTools" / "OpenCorePkg", "macrecovery.py") else ""
+
         print("Select an option:\n")
         print("1. Validate System Requirements")
-        print("2. Download & Setup OpenCore Simplify")
+        print(f"2. Download & Setup OpenCore Simplify{opcore}")
         print("3. Run OpenCore Simplify (Hardware Scanning & EFI Build)")
-        print("4. Download USB Tools (USBToolBox & Kexts)")
-        print("5. Download Additional Tools (OCAT, OpenCorePkg, Rufus)")
-        print("6. Download macOS Recovery Image")
+        print(f"4. Download USB Tools (USBToolBox & Kexts){usb}")
+        print(f"5. Download Additional Tools (OCAT, OpenCorePkg, Rufus){tools}")
+        recovery = self.recovery_status()
+        print("6. Download macOS Recovery Image" + (f" {Colors.OKCYAN}[{recovery}]{Colors.ENDC}" if recovery else ""))
         print("7. USB Formatting Guide")
         print("8. Copy Files to USB")
         print("9. Disk Partitioning Guide")
@@ -558,102 +2714,494 @@ class MacOSInstaller:
         print("15. Exit")
         print()
 
-    def show_installation_log(self):
-        """Display installation log"""
+    def show_installation_log(self, page_size=20):
+        """Display installation log, filtered by level or text and shown a page at a time"""
         self.print_header("INSTALLATION LOG")
-        if self.installation_log:
-            for entry in self.installation_log:
-                print(entry)
-        else:
-            print("No log entries yet")
-        input("\nPress Enter to continue...")
+        level = self.prompt("Minimum level (info/success/warning/error) [default: all]: ").strip().upper()
+        if level and level not in LOG_LEVELS:
+            self.print_warning(f"Unknown level {level}, showing all entries")
+            level = None
+        search = self.prompt("Only entries containing [default: any]: ").strip()
+        entries = self.log_entries(level, search)
+        if not entries:
+            print("No matching log entries" if level or search else "No log entries yet")
+        for start in range(0, len(entries), page_size):
+            for record in entries[start:start + page_size]:
+                print(self.format_log_record(record))
+            shown = start + page_size
+            if shown < len(entries) and self.prompt(
+                    f"-- {shown}/{len(entries)} -- Enter for more, Q to stop: ").strip().upper() == 'Q':
+                break
+        if self._file_logger:
+            self.print_info(f"Full log: {self.log_file}")
+        self.prompt("\nPress Enter to continue...")
+
+    def run_task_graph(self, tasks, max_workers=None, on_complete=None):
+        """Run a dependency graph of tasks, starting each one as soon as it can.
+
+        tasks maps a name to a dict with 'run' (a callable), optional 'deps'
+        (tasks that must succeed first), optional 'after' (tasks that must
+        merely have finished) and 'interactive'. Background tasks run on a
+        thread pool and are started the moment their dependencies finish,
+        even while an interactive task is waiting for input; interactive ones
+        run on the main thread, in declaration order among those that are
+        ready. A task fails when it raises or returns a falsy value, and tasks
+        depending on it are skipped. on_complete(name, result) is called after
+        each successful task, one call at a time, on the thread that ran it.
+        Returns a dict of name -> result (None for failed or skipped tasks).
+        """
+        results, finished, failed = {}, set(), set()
+        pending = list(tasks)
+        futures = {}
+        lock = threading.Condition(threading.RLock())
+        stopping = []
+        self._cancelled.clear()
+        pool = ThreadPoolExecutor(max_workers=max_workers or self.max_concurrent_downloads)
+
+        def ready(name):
+            task = tasks[name]
+            return all(dep in finished for dep in list(task.get('deps', ())) + list(task.get('after', ())))
+
+        def record(name, result, error=None):
+            with lock:
+                results[name] = result
+                finished.add(name)
+                if error is not None or not result:
+                    failed.add(name)
+                    self.log(f"Task {name} failed" + (f": {str(error)}" if error else ""), "ERROR", echo=False)
+                elif on_complete:
+                    on_complete(name, result)
+                dispatch()
+                lock.notify_all()
+
+        def dispatch():
+            # Skip what can no longer run, then start every background task that is ready
+            with lock:
+                if stopping:
+                    return
+                for name in list(pending):
+                    if name in pending and any(dep in failed for dep in tasks[name].get('deps', ())):
+                        pending.remove(name)
+                        self.print_warning(f"Skipping {name}: a step it depends on failed")
+                        record(name, None)
+                for name in list(pending):
+                    if name in pending and not tasks[name].get('interactive') and ready(name):
+                        pending.remove(name)
+                        future = pool.submit(tasks[name]['run'])
+                        futures[future] = name
+                        future.add_done_callback(done)
+
+        def done(future):
+            with lock:
+                if not future.cancelled():
+                    try:
+                        result, error = future.result(), None
+                    except Exception as e:
+                        result, error = None, e
+                    record(futures[future], result, error)
+                del futures[future]
+                lock.notify_all()
+
+        try:
+            dispatch()
+            while True:
+                with lock:
+                    name = next((name for name in pending if tasks[name].get('interactive') and ready(name)), None)
+                    if name is None:
+                        if not futures:
+                            break
+                        lock.wait()
+                        continue
+                    pending.remove(name)
+                try:
+                    result, error = tasks[name]['run'](), None
+                except Exception as e:
+                    result, error = None, e
+                record(name, result, error)
+        except BaseException:
+            # Don't wait for running downloads on Ctrl-C or an unexpected error;
+            # they see the cancel flag at their next chunk and stop
+            with lock:
+                stopping.append(True)
+                for future in list(futures):
+                    future.cancel()
+            self._cancelled.set()
+            pool.shutdown(wait=False)
+            raise
+        pool.shutdown()
+        return results
+
+    def _fingerprint(self, path):
+        """SHA-256 of a file, or of the (name, size, mtime) listing of a folder"""
+        path = Path(path)
+        if path.is_file():
+            return self._hash_file(path)
+        listing = hashlib.sha256()
+        for item in sorted(path.rglob('*')):
+            if item.is_file():
+                stat = item.stat()
+                listing.update(f"{item.relative_to(path).as_posix()}|{stat.st_size}|{stat.st_mtime_ns}\n".encode())
+        return listing.hexdigest()
+
+    def automation_state_file(self):
+        """Checkpoint file of the current output folder; each --output-dir resumes separately"""
+        key = hashlib.sha256(str(Path(self.desktop_path).resolve()).encode()).hexdigest()[:16]
+        return self.state_path / "automation" / f"{key}.json"
+
+    def load_automation_state(self):
+        state = self._load_json(self.automation_state_file(), {'steps': {}})
+        if state.get('output_dir') != str(Path(self.desktop_path).resolve()):
+            state = {'steps': {}}
+        return state
+
+    def save_automation_state(self, state):
+        state['output_dir'] = str(Path(self.desktop_path).resolve())
+        self._write_json_atomic(self.automation_state_file(), state, indent=2)
+
+    def checkpoint_step(self, state, name, artifacts=(), inputs=None):
+        """Record a completed automation step with fingerprints of what it produced.
+
+        inputs holds the settings the step ran with (e.g. the macOS version).
+        """
+        state['steps'][name] = {
+            'completed': datetime.now().isoformat(timespec='seconds'),
+            'artifacts': {str(path): self._fingerprint(path) for path in artifacts if Path(path).exists()},
+            'inputs': inputs or {},
+        }
+        self.save_automation_state(state)
+
+    def step_still_valid(self, state, name, inputs=None, artifacts=()):
+        """True if a checkpointed step ran with the same inputs and its artifacts are unchanged.
 
-    def run_full_automation(self):
-        """Run full automation workflow"""
+        artifacts are the paths the step is expected to produce now; a checkpoint
+        that recorded other paths (another output folder) or missed some of
+        them does not count.
+        """
+        step = state['steps'].get(name)
+        if not step or step.get('inputs', {}) != (inputs or {}):
+            return False
+        if set(step['artifacts']) != {str(path) for path in artifacts}:
+            return False
+        return all(Path(path).exists() and self._fingerprint(path) == fingerprint
+                   for path, fingerprint in step['artifacts'].items())
+
+    @timed_step
+    def run_full_automation(self, resume=False, macos_version=None, skip=()):
+        """Run full automation workflow.
+
+        Every completed step is checkpointed per output folder; with
+        resume=True, steps whose recorded artifacts still verify are skipped.
+        Steps named in skip are not run; in batch mode the manual guides are
+        skipped as well. Returns a status report with a result per step.
+        """
         self.print_header("FULL AUTOMATION WORKFLOW")
         
-        print("This will execute all automated steps in sequence")
+        print("This will execute all automated steps, downloading in the background")
         print("Manual steps (BIOS, USB formatting, installation) will require your input\n")
         
-        confirm = input("Continue with full automation? (Y/N): ").upper()
+        confirm = self.prompt("Continue with full automation? (Y/N): ", default='Y').upper()
         if confirm != 'Y':
-            return
+            return {'status': 'cancelled', 'steps': {}}
 
-        # 1. Validate system
+        # Validate system first; nothing else is worth starting if it fails
         if not self.validate_system():
-            return
-
-        input("Press Enter to continue...")
-
-        # 2. Install dependencies
-        self.install_dependencies()
+            return {'status': 'failed', 'error': 'system validation failed', 'steps': {}}
 
-        # 3. Download and setup OpenCore Simplify
-        opcore_path = self.download_opcore_simplify()
-        if not opcore_path:
-            self.print_error("Failed to setup OpenCore Simplify")
-            return
-
-        # 4. Run OpenCore Simplify
-        if not self.run_opcore_simplify(opcore_path):
-            self.print_error("Failed to run OpenCore Simplify")
-            return
+        state = self.load_automation_state() if resume else {'steps': {}}
+        macos_ver = macos_version or state.get('macos_version')
+        if not macos_ver:
+            macos_ver = self.prompt("\nEnter macOS version (sequoia/sonoma/ventura/monterey) [default: sequoia]: ").lower().strip()
+            if not macos_ver:
+                macos_ver = "sequoia"
+        state['macos_version'] = macos_ver
+        self.save_automation_state(state)
+
+        # Downloads run concurrently; each guide waits only for what it needs,
+        # so the disk/BIOS guides can be read while the downloads are running
+        tasks = {
+            'dependencies': {'run': self.install_dependencies},
+            'opencore_simplify': {'run': self.download_opcore_simplify, 'deps': ['dependencies']},
+            # The recovery image is the longest transfer, so it only waits for OpenCorePkg
+            'opencorepkg': {'run': self.download_opencorepkg, 'deps': ['dependencies']},
+            'tools': {
+                'run': lambda: self.download_all_tools([key for key in self.tool_artifacts if key != 'opencore_url']),
+                'deps': ['dependencies'],
+            },
+            'recovery': {'run': lambda: self.download_macrecovery(macos_ver), 'deps': ['opencorepkg']},
+            'run_opcore_simplify': {
+                'run': lambda: self.run_opcore_simplify(self.desktop_path / "OpenCore-Simplify"),
+                'deps': ['opencore_simplify'], 'interactive': True,
+            },
+            'format_usb': {'run': self.format_usb_guide, 'deps': ['tools'], 'interactive': True},
+            'copy_files': {
+                'run': self.copy_files_to_usb,
+                'deps': ['run_opcore_simplify', 'format_usb'], 'after': ['tools', 'opencorepkg', 'recovery'],
+                'interactive': self.usb_path is None,
+            },
+            'partition_disk': {'run': self.partition_disk_guide, 'interactive': True},
+            'bios': {'run': self.bios_configuration_guide, 'after': ['copy_files', 'partition_disk'], 'interactive': True},
+            'installation': {'run': self.installation_guide, 'after': ['bios'], 'interactive': True},
+            'post_installation': {'run': self.post_installation_guide, 'after': ['installation'], 'interactive': True},
+        }
 
-        # 5. Download USB tools
-        self.download_usb_tools()
+        step_artifacts = {
+            'opencore_simplify': [self.desktop_path / "OpenCore-Simplify"],
+            'opencorepkg': self._tool_paths(['opencore_url']),
+            'tools': self._tool_paths([key for key in self.tool_artifacts if key != 'opencore_url']),
+            'recovery': [self.desktop_path / "macOS_Recovery" / "com.apple.recovery.boot"],
+        }
+        # A checkpoint made for another macOS version does not count
+        step_inputs = {name: {'macos_version': macos_ver} for name in ('recovery', 'copy_files')}
+        skipped = set(skip)
+        unknown = skipped - set(tasks)
+        if unknown:
+            self.print_warning(f"Unknown steps ignored: {', '.join(sorted(unknown))}")
+        if not self.interactive:
+            skipped |= {name for name, task in tasks.items() if task.get('interactive')}
+        for name in skipped & set(tasks):
+            tasks[name]['run'] = lambda: True
+
+        if resume:
+            for name in tasks:
+                if name in skipped:
+                    continue
+                if self.step_still_valid(state, name, step_inputs.get(name), step_artifacts.get(name, ())):
+                    self.print_success(f"{name}: already complete, skipping")
+                    tasks[name]['run'] = lambda: True
+                else:
+                    state['steps'].pop(name, None)
 
-        # 6. Download additional tools
-        self.download_additional_tools()
+        def on_complete(name, result):
+            if name not in state['steps'] and name not in skipped:
+                self.checkpoint_step(state, name, step_artifacts.get(name, ()), step_inputs.get(name))
 
-        # 7. Download macOS recovery
-        macos_ver = input("\nEnter macOS version (sequoia/sonoma/ventura/monterey) [default: sequoia]: ").lower().strip()
-        if not macos_ver:
-            macos_ver = "sequoia"
-        
-        self.download_macrecovery(macos_ver)
+        self.render_progress = False
+        try:
+            results = self.run_task_graph(tasks, on_complete=on_complete)
+        finally:
+            self.render_progress = True
+
+        steps = {name: 'skipped' if name in skipped else 'ok' if result else 'failed'
+                 for name, result in results.items()}
+        failed = [name for name, status in steps.items() if status == 'failed']
+        if failed:
+            self.print_error(f"Steps that failed or were skipped: {', '.join(failed)}")
+            self.print_info("Check the installation log (menu option 14) for details")
+            self.print_info("Run with --resume to continue from the first incomplete step")
+        else:
+            self.print_success("AUTOMATION WORKFLOW COMPLETE!")
+        self.print_info(f"Check {self.desktop_path} for all tools and files")
+        self.print_metrics_summary()
+        return {
+            'status': 'failed' if failed else 'ok',
+            'macos_version': macos_ver,
+            'output_dir': str(self.desktop_path),
+            'steps': steps,
+            'metrics': self.metrics_report(),
+        }
 
-        # 8-11. Manual guides
-        self.format_usb_guide()
-        self.copy_files_to_usb()
-        self.partition_disk_guide()
-        self.bios_configuration_guide()
-        self.installation_guide()
-        self.post_installation_guide()
+    def benchmark_startup(self, runs=5):
+        """Time --help in fresh interpreters against STARTUP_TARGET_SECONDS"""
+        import subprocess
+
+        command = [sys.executable, str(Path(__file__).resolve()), '--help']
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            subprocess.run(command, stdout=subprocess.DEVNULL, check=True)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        median = timings[len(timings) // 2]
+
+        # Heaviest top-level imports, from the interpreter's own import timing
+        trace = subprocess.run(command[:1] + ['-X', 'importtime'] + command[1:],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True).stderr
+        imports = []
+        for line in trace.splitlines():
+            fields = line.split('|')
+            if len(fields) == 3 and fields[1].strip().isdigit() and not fields[2].startswith('  '):
+                imports.append((int(fields[1]), fields[2].strip()))
+        for cumulative, module in sorted(imports, reverse=True)[:5]:
+            self.print_info(f"import {module}: {cumulative / 1000:.1f} ms")
+
+        self.print_info(f"Startup over {runs} runs: median {median * 1000:.0f} ms "
+                        f"(min {timings[0] * 1000:.0f}, max {timings[-1] * 1000:.0f}), "
+                        f"target {STARTUP_TARGET_SECONDS * 1000:.0f} ms")
+        if median > STARTUP_TARGET_SECONDS:
+            self.print_error("Startup is slower than the target")
+            return False
+        self.print_success("Startup is within the target")
+        return True
 
-        self.print_success("AUTOMATION WORKFLOW COMPLETE!")
-        self.print_info("Check your Desktop for all tools and files")
+    def parse_args(self, argv=None):
+        """Command line options; a --config JSON file supplies defaults for them"""
+        parser = argparse.ArgumentParser(
+            prog="macOS-Installer.py",
+            description="macOS Hackintosh installation automation tool for Windows",
+        )
+        parser.add_argument('--auto', action='store_true', help="Run full automation workflow")
+        parser.add_argument('--resume', action='store_true',
+                            help="Continue an interrupted --auto run, skipping verified steps")
+        parser.add_argument('--validate', action='store_true', help="Check system requirements only")
+        parser.add_argument('--benchmark-startup', action='store_true',
+                            help=f"Time cold starts against the {STARTUP_TARGET_SECONDS * 1000:.0f} ms target")
+        parser.add_argument('--batch', action='store_true',
+                            help="Run --auto unattended: no prompts, manual guides skipped, JSON status report")
+        parser.add_argument('--config', help="JSON file with defaults for the options below")
+        parser.add_argument('--macos-version', choices=sorted(self.macos_versions), help="Target macOS version")
+        parser.add_argument('--overwrite', choices=['auto', 'always', 'never'],
+                            help="Existing downloads: revalidate (auto), re-download (always) or keep (never)")
+        parser.add_argument('--output-dir', help="Folder used instead of the Desktop for tools and images")
+        parser.add_argument('--downloads-dir', help="Folder used instead of Downloads")
+        parser.add_argument('--usb', help="USB drive path the copy step writes EFI and recovery files to")
+        parser.add_argument('--rate-limit', type=float, metavar='MBPS',
+                            help="Cap this process's download speed (MB/s); critical files get bandwidth first")
+        parser.add_argument('--shared-rate-limit', type=float, metavar='MBPS',
+                            help="Cap the combined download speed (MB/s) of all installer processes on this machine")
+        parser.add_argument('--mirrors', metavar='JSON',
+                            help="File mapping app_data keys or URLs to lists of alternative download URLs")
+        parser.add_argument('--bundle', help="Offline bundle to take downloads from instead of GitHub/Apple")
+        parser.add_argument('--mirror', help="Base URL of an HTTP mirror serving an unpacked bundle")
+        parser.add_argument('--export-bundle', metavar='PATH',
+                            help="Write an offline bundle of all downloads, with recovery images for "
+                                 "--macos-version and --target versions")
+        parser.add_argument('--skip', action='append', default=[],
+                            help="Automation step to skip (repeatable or comma separated)")
+        parser.add_argument('--target', action='append', default=[], metavar='VERSION=DIR',
+                            help="Prepare a payload for this macOS version in DIR (repeatable); "
+                                 "shared downloads happen once")
+        parser.add_argument('--status-json', help="Write the batch status report to this file instead of stdout")
+        parser.add_argument('--metrics-json', help="Write step timings and transfer statistics to this file on exit")
+        argv = sys.argv[1:] if argv is None else list(argv)
+        args = parser.parse_args(argv)
+
+        if args.config:
+            try:
+                config = json.loads(Path(args.config).read_text())
+            except (OSError, ValueError) as e:
+                parser.error(f"Cannot read config file {args.config}: {str(e)}")
+            if not isinstance(config, dict):
+                parser.error(f"Config file {args.config} must hold a JSON object")
+            # Config values become options placed before the command line, so argparse
+            # checks their types and choices, and the command line still wins
+            config_argv = []
+            for key, value in config.items():
+                option = f"--{key.replace('_', '-')}"
+                action = parser._option_string_actions.get(option)
+                if action is None or option == '--config':
+                    parser.error(f"Unknown config option: {key}")
+                if action.nargs == 0:
+                    if not isinstance(value, bool):
+                        parser.error(f"Config option {key} must be true or false")
+                    config_argv += [option] if value else []
+                elif isinstance(value, list) and action.dest in ('skip', 'target'):
+                    config_argv += [f"{option}={item}" for item in value]
+                elif isinstance(value, (str, int, float)) and not isinstance(value, bool):
+                    config_argv.append(f"{option}={value}")
+                else:
+                    parser.error(f"Config option {key} has an invalid value: {value!r}")
+            args = parser.parse_args(config_argv + argv)
+        args.skip = [step.strip() for item in args.skip for step in item.split(',') if step.strip()]
+        targets = []
+        for item in args.target:
+            version, sep, output_dir = item.partition('=')
+            if not sep or version.lower() not in self.macos_versions or not output_dir:
+                parser.error(f"Invalid --target {item!r}: expected VERSION=DIR with a known macOS version")
+            targets.append((version, output_dir))
+        args.target = targets
+        return args
+
+    def apply_options(self, args):
+        """Apply parsed command line options to the installer"""
+        if args.output_dir:
+            self.desktop_path = Path(args.output_dir).expanduser()
+            self.desktop_path.mkdir(parents=True, exist_ok=True)
+        if args.downloads_dir:
+            self.downloads_path = Path(args.downloads_dir).expanduser()
+        if args.overwrite:
+            self.overwrite_policy = args.overwrite
+        if args.usb:
+            self.usb_path = Path(args.usb)
+        if args.metrics_json:
+            self.metrics_path = Path(args.metrics_json)
+        if args.rate_limit:
+            self.rate_limit = args.rate_limit * 1024**2
+        if args.shared_rate_limit:
+            self.shared_rate_limit = args.shared_rate_limit * 1024**2
+        if args.mirrors:
+            self.artifact_mirrors = self._load_json(Path(args.mirrors).expanduser())
+        if args.bundle:
+            self.bundle_path = Path(args.bundle).expanduser()
+        if args.mirror:
+            self.mirror_url = args.mirror
+        if args.batch:
+            self.interactive = False
+            # stdout carries only the JSON status report; everything else goes to stderr
+            self.status_stream = sys.stdout
+            sys.stdout = sys.stderr
+            self.progress_tty = sys.stdout.isatty()
+
+    def write_status(self, status, path=None):
+        """Emit a machine-readable status report for job runners"""
+        report = json.dumps(status, indent=2)
+        if path:
+            Path(path).write_text(report)
+        else:
+            print(report, file=self.status_stream)
+            self.status_stream.flush()
 
     def main(self):
         """Main application loop"""
         try:
-            # Check for command line arguments
-            if len(sys.argv) > 1:
-                if sys.argv[1] == '--auto':
-                    self.run_full_automation()
-                    return
-                elif sys.argv[1] == '--validate':
-                    self.validate_system()
-                    return
-                elif sys.argv[1] == '--help':
-                    print("Usage: python macOS-Installer.py [--auto|--validate|--help]")
-                    print("  --auto     : Run full automation workflow")
-                    print("  --validate : Check system requirements only")
-                    print("  --help     : Show this help message")
-                    return
+            args = self.parse_args(sys.argv[1:])
+            self.apply_options(args)
+
+            if args.benchmark_startup:
+                sys.exit(0 if self.benchmark_startup() else 1)
+            if args.export_bundle:
+                versions = {version.lower() for version, _ in args.target}
+                if args.macos_version:
+                    versions.add(args.macos_version)
+                sys.exit(0 if self.export_bundle(args.export_bundle, sorted(versions)) else 1)
+            if args.target:
+                try:
+                    prepared = self.prepare_targets(args.target)
+                except Exception as e:
+                    self.print_error(f"Bulk preparation failed: {str(e)}")
+                    prepared = None
+                ok = self.targets_complete(prepared)
+                if args.batch or args.status_json:
+                    self.write_status({'status': 'ok' if ok else 'failed', 'targets': prepared or {}},
+                                      args.status_json)
+                sys.exit(0 if ok else 1)
+            if args.batch:
+                try:
+                    status = self.run_full_automation(resume=args.resume, macos_version=args.macos_version,
+                                                      skip=args.skip)
+                except Exception as e:
+                    status = {'status': 'error', 'error': str(e), 'steps': {}}
+                self.write_status(status, args.status_json)
+                sys.exit(0 if status['status'] == 'ok' else 1)
+            if args.auto or args.resume:
+                self.run_full_automation(resume=args.resume, macos_version=args.macos_version, skip=args.skip)
+                return
+            if args.validate:
+                self.validate_system()
+                return
 
             # Interactive menu
             while True:
                 self.show_main_menu()
-                choice = input("Enter choice (1-15): ").strip()
+                choice = self.prompt("Enter choice (1-15): ").strip()
 
                 if choice == '1':
                     self.validate_system()
-                    input("\nPress Enter to continue...")
+                    self.prompt("\nPress Enter to continue...")
 
                 elif choice == '2':
                     self.install_dependencies()
                     self.download_opcore_simplify()
-                    input("\nPress Enter to continue...")
+                    self.prompt("\nPress Enter to continue...")
 
                 elif choice == '3':
                     opcore_path = self.desktop_path / "OpenCore-Simplify"
@@ -661,61 +3209,64 @@ class MacOSInstaller:
                         self.run_opcore_simplify(opcore_path)
                     else:
                         self.print_error("OpenCore-Simplify not found. Download it first (Option 2)")
-                    input("\nPress Enter to continue...")
+                    self.prompt("\nPress Enter to continue...")
 
                 elif choice == '4':
                     self.download_usb_tools()
-                    input("\nPress Enter to continue...")
+                    self.prompt("\nPress Enter to continue...")
 
                 elif choice == '5':
                     self.download_additional_tools()
-                    input("\nPress Enter to continue...")
+                    self.prompt("\nPress Enter to continue...")
 
                 elif choice == '6':
-                    macos_ver = input("Enter macOS version (sequoia/sonoma/ventura/monterey) [default: sequoia]: ").lower().strip()
+                    macos_ver = self.prompt("Enter macOS version (sequoia/sonoma/ventura/monterey) [default: sequoia]: ").lower().strip()
                     if not macos_ver:
                         macos_ver = "sequoia"
-                    self.download_macrecovery(macos_ver)
-                    input("\nPress Enter to continue...")
+                    background = self.prompt("Download in the background and keep using the menu? (Y/N) [default: Y]: ").upper() != 'N'
+                    self.download_macrecovery(macos_ver, background=background)
+                    self.prompt("\nPress Enter to continue...")
 
                 elif choice == '7':
                     self.format_usb_guide()
-                    input("\nPress Enter to continue...")
+                    self.prompt("\nPress Enter to continue...")
 
                 elif choice == '8':
                     self.copy_files_to_usb()
-                    input("\nPress Enter to continue...")
+                    self.prompt("\nPress Enter to continue...")
 
                 elif choice == '9':
                     self.partition_disk_guide()
-                    input("\nPress Enter to continue...")
+                    self.prompt("\nPress Enter to continue...")
 
                 elif choice == '10':
                     self.bios_configuration_guide()
-                    input("\nPress Enter to continue...")
+                    self.prompt("\nPress Enter to continue...")
 
                 elif choice == '11':
                     self.installation_guide()
-                    input("\nPress Enter to continue...")
+                    self.prompt("\nPress Enter to continue...")
 
                 elif choice == '12':
                     self.post_installation_guide()
-                    input("\nPress Enter to continue...")
+                    self.prompt("\nPress Enter to continue...")
 
                 elif choice == '13':
                     self.troubleshooting_guide()
-                    input("\nPress Enter to continue...")
+                    self.prompt("\nPress Enter to continue...")
 
                 elif choice == '14':
                     self.show_installation_log()
 
                 elif choice == '15':
+                    if self.metrics['steps']:
+                        self.print_metrics_summary()
                     self.print_success("Exiting... Good luck with your macOS installation!")
                     break
 
                 else:
                     self.print_error("Invalid choice. Please try again.")
-                    input("Press Enter to continue...")
+                    self.prompt("Press Enter to continue...")
 
         except KeyboardInterrupt:
             print(f"\n{Colors.WARNING}Installation interrupted by user{Colors.ENDC}")
@@ -723,6 +3274,9 @@ class MacOSInstaller:
         except Exception as e:
             self.print_error(f"An error occurred: {str(e)}")
             sys.exit(1)
+        finally:
+            if self.metrics_path:
+                self.export_metrics(self.metrics_path)
 
 if __name__ == "__main__":
     installer = MacOSInstaller()
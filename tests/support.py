@@ -0,0 +1,150 @@
+"""Shared fixtures: the installer module, a local HTTP server and a per-test home folder.
+
+The server serves files from a temporary folder and misbehaves on request:
+?drop cuts the first transfer of a file off halfway, ?norange ignores Range
+headers, ?slow trickles the body out at about 80 KB/s. No test needs network
+access.
+"""
+
+import hashlib
+import http.server
+import importlib.util
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+REPO = Path(__file__).resolve().parent.parent
+spec = importlib.util.spec_from_file_location("macos_installer", REPO / "macOS-Installer.py")
+macos_installer = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(macos_installer)
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    root = None
+    requests = []
+    drops = {}
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        path, _, query = self.path.partition('?')
+        flags = set(query.split('&'))
+        Handler.requests.append((path, query, dict(self.headers)))
+        file_path = Path(Handler.root) / path.lstrip('/')
+        if not file_path.is_file():
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        data = file_path.read_bytes()
+        etag = '"%s"' % hashlib.md5(data).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        start, end, status = 0, len(data) - 1, 200
+        ranged = self.headers.get('Range') and 'norange' not in flags
+        if ranged:
+            first, _, last = self.headers['Range'].split('=')[1].partition('-')
+            start, end = int(first), min(int(last) if last else len(data) - 1, len(data) - 1)
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{len(data)}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            status = 206
+        body = data[start:end + 1]
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        if 'norange' not in flags:
+            self.send_header('Accept-Ranges', 'bytes')
+        if ranged:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(data)}')
+        self.end_headers()
+
+        if 'drop' in flags and not Handler.drops.get(self.path):
+            Handler.drops[self.path] = True
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            self.connection.shutdown(2)
+            return
+        if 'slow' in flags:
+            try:
+                for start in range(0, len(body), 4096):
+                    self.wfile.write(body[start:start + 4096])
+                    self.wfile.flush()
+                    time.sleep(0.05)
+            except OSError:
+                self.close_connection = True  # The client gave up on us
+            return
+        self.wfile.write(body)
+
+
+class Server:
+    """Local HTTP server started once per test run"""
+    root = None
+    base_url = None
+
+    @classmethod
+    def start(cls):
+        if cls.base_url is None:
+            cls.root = tempfile.mkdtemp()
+            Handler.root = cls.root
+            httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+            threading.Thread(target=httpd.serve_forever, daemon=True).start()
+            cls.base_url = f"http://127.0.0.1:{httpd.server_address[1]}/"
+        return cls.base_url
+
+
+def random_bytes(size, seed=0):
+    """Reproducible random bytes (Random.randbytes needs Python 3.9)"""
+    return random.Random(seed).getrandbits(8 * size).to_bytes(size, 'little')
+
+
+def serve(name, size, seed=0):
+    """Put size random bytes on the server as name and return them"""
+    data = random_bytes(size, seed)
+    path = Path(Server.root) / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return data
+
+
+class InstallerTestCase(unittest.TestCase):
+    """Each test gets an installer whose home folder is a temporary directory"""
+
+    def setUp(self):
+        self.base_url = Server.start()
+        self.home = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.home, ignore_errors=True)
+        patcher = mock.patch.dict(os.environ, {'HOME': str(self.home), 'USERPROFILE': str(self.home)})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.installer = self.make_installer()
+        Handler.requests.clear()
+        Handler.drops.clear()
+
+    def make_installer(self):
+        installer = macos_installer.MacOSInstaller()
+        installer.desktop_path = self.home / "Desktop"
+        installer.downloads_path = self.home / "Downloads"
+        installer.retry_backoff = 0.01
+        installer.render_progress = False
+        return installer
+
+    def requests_for(self, name):
+        return [(query, headers) for path, query, headers in Handler.requests if path == '/' + name]
@@ -0,0 +1,59 @@
+"""Automation checkpoints: per output folder, tied to inputs and to the files a step produced.
+
+Run with: python -m pytest tests  (or python -m unittest discover tests)
+"""
+
+import unittest
+
+from support import InstallerTestCase
+
+
+class AutomationStateTests(InstallerTestCase):
+
+    def checkpoint_tools(self, installer):
+        folder = installer.desktop_path / "USBTools"
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / "USBToolBox.exe").write_bytes(b'tool')
+        state = installer.load_automation_state()
+        installer.checkpoint_step(state, 'tools', [folder])
+        return folder
+
+    def test_state_is_kept_per_output_folder(self):
+        self.installer.desktop_path = self.home / "B"
+        self.checkpoint_tools(self.installer)
+
+        other = self.make_installer()
+        other.desktop_path = self.home / "A"
+        state = other.load_automation_state()
+
+        self.assertEqual(state['steps'], {})
+        self.assertFalse(other.step_still_valid(state, 'tools', artifacts=[other.desktop_path / "USBTools"]))
+        self.assertIn('tools', self.installer.load_automation_state()['steps'])
+
+    def test_checkpoint_for_other_paths_is_rejected(self):
+        folder = self.checkpoint_tools(self.installer)
+        state = self.installer.load_automation_state()
+
+        self.assertTrue(self.installer.step_still_valid(state, 'tools', artifacts=[folder]))
+        self.assertFalse(self.installer.step_still_valid(state, 'tools', artifacts=[self.home / "elsewhere"]))
+        self.assertFalse(self.installer.step_still_valid(state, 'tools', artifacts=[folder, self.home / "missing"]))
+
+    def test_changed_artifact_invalidates_checkpoint(self):
+        folder = self.checkpoint_tools(self.installer)
+        state = self.installer.load_automation_state()
+        (folder / "USBToolBox.exe").write_bytes(b'changed tool')
+
+        self.assertFalse(self.installer.step_still_valid(state, 'tools', artifacts=[folder]))
+
+    def test_checkpoint_for_other_macos_version_is_rejected(self):
+        folder = self.installer.desktop_path / "macOS_Recovery"
+        folder.mkdir(parents=True)
+        state = self.installer.load_automation_state()
+        self.installer.checkpoint_step(state, 'recovery', [folder], {'macos_version': 'sonoma'})
+
+        self.assertTrue(self.installer.step_still_valid(state, 'recovery', {'macos_version': 'sonoma'}, [folder]))
+        self.assertFalse(self.installer.step_still_valid(state, 'recovery', {'macos_version': 'ventura'}, [folder]))
+
+
+if __name__ == '__main__':
+    unittest.main()
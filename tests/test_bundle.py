@@ -0,0 +1,41 @@
+"""Offline bundles: downloads resolve from an exported bundle without touching the network.
+
+Run with: python -m pytest tests  (or python -m unittest discover tests)
+"""
+
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from support import InstallerTestCase, Server, serve
+
+
+class BundleTests(InstallerTestCase):
+
+    def point_tools_at_server(self, installer):
+        for key, (_, filename, _) in installer.tool_artifacts.items():
+            installer.app_data[key] = self.base_url + 'tools/' + filename
+        installer.app_data['opcore_url'] = self.base_url + 'tools/OpCore-Simplify.zip'
+
+    def test_downloads_resolve_from_bundle_without_network(self):
+        for index, (_, filename, _) in enumerate(self.installer.tool_artifacts.values()):
+            serve('tools/' + filename, 32 * 1024, seed=10 + index)
+        serve('tools/OpCore-Simplify.zip', 32 * 1024, seed=20)
+        self.point_tools_at_server(self.installer)
+        bundle = self.home / "tools.bundle"
+        self.assertTrue(self.installer.export_bundle(bundle))
+
+        offline = self.make_installer()
+        self.point_tools_at_server(offline)
+        offline.bundle_path = bundle
+        offline.cache_max_bytes = 0
+        url = offline.app_data['opencore_url']
+        with mock.patch.object(offline, 'http_get', side_effect=AssertionError("network used")):
+            path = offline.download_file(url, self.home / "offline", quiet=True)
+
+        self.assertEqual(Path(path).read_bytes(), (Path(Server.root) / 'tools' / 'OpenCorePkg.zip').read_bytes())
+        self.assertEqual(offline.download_status['OpenCorePkg.zip'], 'from bundle')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""Download cache: hits without network access, the shared cache and LRU eviction.
+
+Run with: python -m pytest tests  (or python -m unittest discover tests)
+"""
+
+import itertools
+import unittest
+from unittest import mock
+
+from support import InstallerTestCase, macos_installer, random_bytes, serve
+
+
+class CacheTests(InstallerTestCase):
+
+    def test_second_download_is_served_from_the_cache(self):
+        data = serve('cache/tool.bin', 64 * 1024)
+        url = self.base_url + 'cache/tool.bin'
+        self.installer.download_file(url, self.home / "first", quiet=True)
+
+        path = self.installer.download_file(url, self.home / "second", quiet=True)
+
+        self.assertEqual(path.read_bytes(), data)
+        self.assertEqual(len(self.requests_for('cache/tool.bin')), 1)
+        self.assertEqual(self.installer.cache_stats['hits'], 1)
+
+    def test_shared_cache_is_copied_into_the_local_cache(self):
+        data = serve('cache/shared.bin', 32 * 1024)
+        url = self.base_url + 'cache/shared.bin'
+        seeder = self.make_installer()
+        seeder.cache_path = self.home / "shared"
+        seeder.download_file(url, self.home / "seed", quiet=True)
+        seeded = len(self.requests_for('cache/shared.bin'))
+
+        self.installer.shared_cache_path = self.home / "shared"
+        path = self.installer.download_file(url, self.home / "out", quiet=True)
+
+        self.assertEqual(path.read_bytes(), data)
+        self.assertEqual(len(self.requests_for('cache/shared.bin')), seeded)
+        self.assertEqual(self.installer.cache_stats['shared_hits'], 1)
+        self.assertIsNotNone(self.installer.cache_lookup(url))
+        self.assertEqual(self.installer.cache_stats['hits'], 1)
+
+    def test_least_recently_used_objects_are_evicted(self):
+        self.installer.cache_max_bytes = 10000
+        files = {}
+        for name in ('a', 'b', 'c'):
+            files[name] = self.home / name
+            files[name].write_bytes(random_bytes(4096, name))
+
+        clock = itertools.count(1000)
+        with mock.patch.object(macos_installer.time, 'time', side_effect=lambda: next(clock)):
+            self.installer.cache_store('http://example.invalid/a', files['a'])
+            self.installer.cache_store('http://example.invalid/b', files['b'])
+            self.assertIsNotNone(self.installer.cache_lookup('http://example.invalid/a'))
+            self.installer.cache_store('http://example.invalid/c', files['c'])
+
+            self.assertIsNotNone(self.installer.cache_lookup('http://example.invalid/a'))
+            self.assertIsNone(self.installer.cache_lookup('http://example.invalid/b'))
+            self.assertIsNotNone(self.installer.cache_lookup('http://example.invalid/c'))
+        objects = list((self.installer.cache_path / "objects").rglob('*'))
+        self.assertEqual(len([obj for obj in objects if obj.is_file()]), 2)
+
+    def test_zero_size_disables_the_cache(self):
+        serve('cache/off.bin', 4096)
+        url = self.base_url + 'cache/off.bin'
+        self.installer.cache_max_bytes = 0
+        self.installer.download_file(url, self.home / "first", quiet=True)
+        self.installer.download_file(url, self.home / "second", quiet=True)
+
+        self.assertEqual(len(self.requests_for('cache/off.bin')), 2)
+        self.assertFalse(self.installer.cache_path.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""Recovery image chunklists: parsing, verification and repairing only the bad chunks.
+
+Run with: python -m pytest tests  (or python -m unittest discover tests)
+"""
+
+import hashlib
+import struct
+import unittest
+
+from support import InstallerTestCase, serve
+
+CHUNK_SIZES = [16 * 1024, 16 * 1024, 16 * 1024, 5000]
+
+
+def write_chunklist(path, data, sizes):
+    """Write an Apple chunklist (CNKL header followed by size + SHA-256 per chunk)"""
+    header_size = 36
+    body, offset = b'', 0
+    for size in sizes:
+        body += struct.pack('<I32s', size, hashlib.sha256(data[offset:offset + size]).digest())
+        offset += size
+    header = struct.pack('<4sIBBBxQQQ', b'CNKL', header_size, 1, 1, 2, len(sizes),
+                         header_size, header_size + len(body))
+    path.write_bytes(header + body + b'\0' * 256)
+
+
+class ChunklistTests(InstallerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.data = serve('recovery/BaseSystem.dmg', sum(CHUNK_SIZES), seed=12)
+        self.url = self.base_url + 'recovery/BaseSystem.dmg'
+        self.chunklist_path = self.home / "BaseSystem.chunklist"
+        write_chunklist(self.chunklist_path, self.data, CHUNK_SIZES)
+        self.dmg_path = self.home / "BaseSystem.dmg"
+        self.dmg_path.write_bytes(self.data)
+
+    def test_parse_chunklist(self):
+        chunks = self.installer.parse_chunklist(self.chunklist_path)
+
+        self.assertEqual([(offset, size) for offset, size, _ in chunks],
+                         [(0, 16384), (16384, 16384), (32768, 16384), (49152, 5000)])
+        self.assertEqual(chunks[3][2], hashlib.sha256(self.data[49152:]).digest())
+
+    def test_other_files_are_not_chunklists(self):
+        with self.assertRaises(IOError):
+            self.installer.parse_chunklist(self.dmg_path)
+
+    def test_verify_reports_damaged_and_missing_chunks(self):
+        chunks = self.installer.parse_chunklist(self.chunklist_path)
+        self.assertEqual(self.installer.verify_chunks(self.dmg_path, chunks), [])
+
+        damaged = bytearray(self.data)
+        damaged[20000] ^= 0xFF
+        self.dmg_path.write_bytes(bytes(damaged[:40000]))
+
+        self.assertEqual(self.installer.verify_chunks(self.dmg_path, chunks), [1, 2, 3])
+        self.assertEqual(self.installer.verify_chunks(self.dmg_path, chunks, only=[0, 1]), [1])
+
+    def test_repair_fetches_only_bad_chunks(self):
+        chunks = self.installer.parse_chunklist(self.chunklist_path)
+        damaged = bytearray(self.data)
+        damaged[20000] ^= 0xFF
+        self.dmg_path.write_bytes(bytes(damaged[:40000]))
+        bad = self.installer.verify_chunks(self.dmg_path, chunks)
+
+        self.installer._repair_chunks(self.url, {}, self.dmg_path, chunks, bad)
+
+        self.assertEqual(self.dmg_path.read_bytes(), self.data)
+        ranges = sorted(headers['Range'] for _, headers in self.requests_for('recovery/BaseSystem.dmg'))
+        self.assertEqual(ranges, ['bytes=16384-32767', 'bytes=32768-49151', 'bytes=49152-54151'])
+
+
+if __name__ == '__main__':
+    unittest.main()
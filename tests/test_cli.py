@@ -0,0 +1,74 @@
+"""Command line and --config parsing, and the batch-mode status report.
+
+Run with: python -m pytest tests  (or python -m unittest discover tests)
+"""
+
+import contextlib
+import io
+import json
+import sys
+import unittest
+from unittest import mock
+
+from support import InstallerTestCase
+
+
+class ParseArgsTests(InstallerTestCase):
+
+    def write_config(self, config):
+        path = self.home / "batch.json"
+        path.write_text(json.dumps(config))
+        return str(path)
+
+    def parse_error(self, argv):
+        with contextlib.redirect_stderr(io.StringIO()) as stderr, self.assertRaises(SystemExit):
+            self.installer.parse_args(argv)
+        return stderr.getvalue()
+
+    def test_config_values_are_typed_and_merged(self):
+        path = self.write_config({'macos-version': 'sonoma', 'rate-limit': '5', 'batch': True,
+                                  'skip': ['recovery'], 'target': ['ventura=/tmp/v']})
+
+        args = self.installer.parse_args(['--config', path, '--skip', 'bios'])
+
+        self.assertEqual(args.macos_version, 'sonoma')
+        self.assertEqual(args.rate_limit, 5.0)
+        self.assertTrue(args.batch)
+        self.assertEqual(args.skip, ['recovery', 'bios'])
+        self.assertEqual(args.target, [('ventura', '/tmp/v')])
+
+    def test_command_line_overrides_config(self):
+        path = self.write_config({'macos-version': 'sonoma', 'overwrite': 'never'})
+
+        args = self.installer.parse_args(['--config', path, '--macos-version', 'ventura'])
+
+        self.assertEqual(args.macos_version, 'ventura')
+        self.assertEqual(args.overwrite, 'never')
+
+    def test_config_values_are_validated(self):
+        for config in ({'macos-version': 'catalina'}, {'overwrite': 'sometimes'}, {'rate-limit': 'fast'},
+                       {'batch': 'yes'}, {'usb': ['E:\\']}, {'no-such-option': 1}):
+            with self.subTest(config=config):
+                self.parse_error(['--config', self.write_config(config)])
+
+    def test_invalid_target_is_rejected(self):
+        self.assertIn('--target', self.parse_error(['--target', 'catalina=/tmp/c']))
+
+
+class BatchOutputTests(InstallerTestCase):
+
+    def test_batch_stdout_holds_only_the_status_report(self):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        status = {'status': 'ok', 'steps': {'tools': 'ok'}}
+        with mock.patch.object(sys, 'stdout', stdout), mock.patch.object(sys, 'stderr', stderr):
+            self.installer.apply_options(self.installer.parse_args(['--batch']))
+            self.installer.print_header("DOWNLOADING")
+            self.installer.print_success("done")
+            self.installer.write_status(status)
+
+        self.assertEqual(json.loads(stdout.getvalue()), status)
+        self.assertIn("done", stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
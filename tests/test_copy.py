@@ -0,0 +1,84 @@
+"""copy_tree: skipping unchanged files, repairing damaged ones and the manifest check.
+
+Run with: python -m pytest tests  (or python -m unittest discover tests)
+"""
+
+import os
+import shutil
+import subprocess
+import unittest
+
+from support import InstallerTestCase, random_bytes
+
+
+class CopyTreeTests(InstallerTestCase):
+
+    def make_source(self):
+        source = self.home / "EFI"
+        for name, size in (('BOOT/BOOTx64.efi', 300 * 1024), ('OC/config.plist', 4096),
+                           ('OC/Kexts/Lilu.kext/Contents/Info.plist', 2048)):
+            path = source / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(random_bytes(size, name))
+        return source
+
+    def test_copies_then_skips_unchanged_files(self):
+        source = self.make_source()
+        target = self.home / "usb" / "EFI"
+
+        self.assertEqual(self.installer.copy_tree(source, target)[:2], (3, 0))
+        self.assertEqual(self.installer.copy_tree(source, target), (0, 3, 0))
+        for path in source.rglob('*'):
+            if path.is_file():
+                self.assertEqual((target / path.relative_to(source)).read_bytes(), path.read_bytes())
+
+    def test_recopies_damaged_file_of_same_size(self):
+        source = self.make_source()
+        target = self.home / "usb" / "EFI"
+        self.installer.copy_tree(source, target)
+        damaged = target / "OC" / "config.plist"
+        damaged.write_bytes(b'\0' * damaged.stat().st_size)
+
+        copied, skipped, size = self.installer.copy_tree(source, target)
+
+        self.assertEqual((copied, skipped, size), (1, 2, 4096))
+        self.assertEqual(damaged.read_bytes(), (source / "OC" / "config.plist").read_bytes())
+
+    def test_source_not_matching_manifest_fails(self):
+        source = self.make_source()
+        plist = source / "OC" / "config.plist"
+        self.installer.record_manifest(None, plist, None)
+        plist.write_bytes(b'x' * plist.stat().st_size)
+
+        with self.assertRaises(IOError):
+            self.installer.copy_tree(source, self.home / "usb" / "EFI")
+
+
+@unittest.skipUnless(hasattr(os, 'geteuid') and os.geteuid() == 0 and shutil.which('mkfs.vfat'),
+                     "needs root and mkfs.vfat to loop-mount a FAT32 image")
+class Fat32CopyTests(InstallerTestCase):
+    """copy_tree onto a loop-mounted FAT32 image, as a USB drive would be"""
+
+    def setUp(self):
+        super().setUp()
+        image = self.home / "usb.img"
+        self.mount_point = self.home / "usb"
+        self.mount_point.mkdir()
+        with open(image, 'wb') as f:
+            f.truncate(64 * 1024**2)
+        try:
+            subprocess.run(['mkfs.vfat', '-F', '32', str(image)], check=True, capture_output=True)
+            subprocess.run(['mount', '-o', 'loop', str(image), str(self.mount_point)], check=True, capture_output=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            self.skipTest(f"cannot loop-mount a FAT32 image here: {e}")
+        self.addCleanup(subprocess.run, ['umount', str(self.mount_point)], capture_output=True)
+
+    def test_copy_to_fat32(self):
+        source = CopyTreeTests.make_source(self)
+
+        self.assertEqual(self.installer.copy_tree(source, self.mount_point / "EFI")[:2], (3, 0))
+        self.assertEqual(self.installer.copy_tree(source, self.mount_point / "EFI")[:2], (0, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
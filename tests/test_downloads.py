@@ -0,0 +1,103 @@
+"""download_file against a local HTTP server that drops connections and ignores ranges.
+
+Run with: python -m pytest tests  (or python -m unittest discover tests)
+"""
+
+import json
+import unittest
+from pathlib import Path
+
+from support import InstallerTestCase, serve
+
+
+class DownloadTests(InstallerTestCase):
+
+    def test_resumes_dropped_transfer_with_range(self):
+        data = serve('resume.bin', 3 * 1024**2)
+        self.installer.download_segments = 1
+
+        path = self.installer.download_file(self.base_url + 'resume.bin?drop', self.home / "out", quiet=True)
+
+        self.assertEqual(Path(path).read_bytes(), data)
+        first, second = self.requests_for('resume.bin')
+        self.assertNotIn('Range', first[1])
+        self.assertRegex(second[1]['Range'], r'^bytes=[1-9]\d*-$')
+        self.assertFalse(Path(str(path) + '.part').exists())
+
+    def test_starts_over_when_server_ignores_range(self):
+        data = serve('norange.bin', 3 * 1024**2, seed=1)
+        self.installer.download_segments = 1
+
+        path = self.installer.download_file(self.base_url + 'norange.bin?drop&norange', self.home / "out", quiet=True)
+
+        self.assertEqual(Path(path).read_bytes(), data)
+        self.assertEqual(len(self.requests_for('norange.bin')), 2)
+
+    def test_segmented_fetch(self):
+        data = serve('segmented.bin', 2 * 1024**2, seed=2)
+        self.installer.download_segments = 4
+        self.installer.min_segment_size = 256 * 1024
+
+        path = self.installer.download_file(self.base_url + 'segmented.bin', self.home / "out", quiet=True)
+
+        self.assertEqual(Path(path).read_bytes(), data)
+        ranges = [headers['Range'] for _, headers in self.requests_for('segmented.bin') if 'Range' in headers]
+        self.assertEqual(len(ranges), 3)  # the first segment reuses the initial response
+
+    def test_segmented_fetch_resumes_dropped_segments(self):
+        data = serve('segdrop.bin', 2 * 1024**2, seed=4)
+        self.installer.download_segments = 4
+        self.installer.min_segment_size = 256 * 1024
+
+        path = self.installer.download_file(self.base_url + 'segdrop.bin?drop', self.home / "out", quiet=True)
+
+        self.assertEqual(Path(path).read_bytes(), data)
+
+    def test_revalidates_moving_url_with_304(self):
+        serve('latest/tool.zip', 64 * 1024, seed=3)
+        url = self.base_url + 'latest/tool.zip'
+        self.installer.download_file(url, self.home / "out", quiet=True)
+
+        path = self.installer.download_file(url, self.home / "out", quiet=True)
+
+        self.assertIsNotNone(path)
+        self.assertEqual(self.installer.download_status['tool.zip'], 'up to date')
+        query, headers = self.requests_for('latest/tool.zip')[-1]
+        self.assertIn('If-None-Match', headers)
+
+    def test_pinned_url_is_not_revalidated(self):
+        serve('releases/v1/tool.zip', 64 * 1024, seed=5)
+        url = self.base_url + 'releases/v1/tool.zip'
+        self.installer.download_file(url, self.home / "out", quiet=True)
+
+        self.installer.download_file(url, self.home / "out", quiet=True)
+
+        self.assertEqual(len(self.requests_for('releases/v1/tool.zip')), 1)
+        self.assertEqual(self.installer.download_status['tool.zip'], 'cached')
+
+    def test_stale_partial_larger_than_file_restarts(self):
+        data = serve('shrunk.bin', 100 * 1024, seed=6)
+        out = self.home / "out"
+        out.mkdir()
+        url = self.base_url + 'shrunk.bin'
+        part_path = out / 'shrunk.bin.part'
+        part_path.write_bytes(b'x' * 150 * 1024)
+        self.installer._part_meta_path(part_path).write_text(json.dumps({'url': url, 'received': 150 * 1024}))
+        self.installer.download_segments = 1
+
+        path = self.installer.download_file(url, out, quiet=True)
+
+        self.assertEqual(Path(path).read_bytes(), data)
+        statuses = [headers.get('Range') for _, headers in self.requests_for('shrunk.bin')]
+        self.assertEqual(statuses, ['bytes=153600-', None])
+
+    def test_404_is_not_retried(self):
+        path = self.installer.download_file(self.base_url + 'missing.bin', self.home / "out", quiet=True)
+
+        self.assertIsNone(path)
+        self.assertEqual(len(self.requests_for('missing.bin')), 1)
+        self.assertIn('404', self.installer.download_errors['missing.bin'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""extract_zip: include/exclude filters, skipping unchanged members and unsafe member names.
+
+Run with: python -m pytest tests  (or python -m unittest discover tests)
+"""
+
+import io
+import os
+import unittest
+import zipfile
+
+from support import InstallerTestCase, random_bytes
+
+
+class ExtractZipTests(InstallerTestCase):
+
+    members = {
+        'EFI/BOOT/BOOTx64.efi': 64 * 1024,
+        'EFI/OC/OpenCore.efi': 32 * 1024,
+        'EFI/OC/Drivers/OpenRuntime.efi': 8192,
+        'Docs/Configuration.pdf': 16 * 1024,
+        'Utilities/ocvalidate/ocvalidate': 4096,
+    }
+
+    def make_zip(self, extra=()):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for name, size in self.members.items():
+                archive.writestr(name, random_bytes(size, name))
+            for name, data in extra:
+                archive.writestr(name, data)
+        path = self.home / "OpenCore.zip"
+        path.write_bytes(buffer.getvalue())
+        return path
+
+    def extracted(self, root):
+        return sorted(path.relative_to(root).as_posix() for path in root.rglob('*') if path.is_file())
+
+    def test_include_and_exclude_filters(self):
+        target = self.home / "out"
+
+        self.assertTrue(self.installer.extract_zip(self.make_zip(), target, quiet=True,
+                                                   include=['EFI/*', 'Utilities/*'], exclude=['*/Drivers/*']))
+
+        self.assertEqual(self.extracted(target), ['EFI/BOOT/BOOTx64.efi', 'EFI/OC/OpenCore.efi',
+                                                  'Utilities/ocvalidate/ocvalidate'])
+
+    def test_only_missing_or_damaged_members_are_rewritten(self):
+        archive = self.make_zip()
+        target = self.home / "out"
+        self.installer.extract_zip(archive, target, quiet=True)
+        untouched = target / "EFI/OC/OpenCore.efi"
+        os.utime(untouched, ns=(1, 1))
+        (target / "EFI/BOOT/BOOTx64.efi").write_bytes(b'damaged')
+        (target / "Docs/Configuration.pdf").unlink()
+        written = self.installer.metrics['counters']['bytes_extracted']
+
+        self.assertTrue(self.installer.extract_zip(archive, target, quiet=True))
+
+        self.assertEqual(untouched.stat().st_mtime_ns, 1)
+        for name, size in self.members.items():
+            self.assertEqual((target / name).read_bytes(), random_bytes(size, name))
+        self.assertEqual(self.installer.metrics['counters']['bytes_extracted'] - written, 64 * 1024 + 16 * 1024)
+
+    def test_extracts_from_a_buffer(self):
+        target = self.home / "out"
+        with open(self.make_zip(), 'rb') as f:
+            buffer = io.BytesIO(f.read())
+
+        self.assertTrue(self.installer.extract_zip(buffer, target, name="OpenCore.zip", quiet=True))
+
+        self.assertEqual(self.extracted(target), sorted(self.members))
+
+    def test_member_names_cannot_escape_the_target(self):
+        target = self.home / "out"
+
+        self.installer.extract_zip(self.make_zip([('../../evil.txt', b'x'), ('/abs/evil.txt', b'y')]),
+                                   target, quiet=True, include=['*evil.txt'])
+
+        self.assertEqual(self.extracted(target), ['abs/evil.txt', 'evil.txt'])
+        self.assertFalse((self.home / "evil.txt").exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
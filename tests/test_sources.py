@@ -0,0 +1,53 @@
+"""Mirror ranking and failing over from a stalled source.
+
+Run with: python -m pytest tests  (or python -m unittest discover tests)
+"""
+
+import unittest
+
+from support import InstallerTestCase, serve
+
+
+class SourceTests(InstallerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.data = serve('sources/image.bin', 96 * 1024, seed=25)
+        self.slow = self.base_url + 'sources/image.bin?slow'
+        self.fast = self.base_url + 'sources/image.bin'
+        self.installer.source_probe_bytes = 8192
+        self.installer.min_source_throughput = 200 * 1024
+        self.installer.stall_window = 0.3
+
+    def test_sources_are_ranked_by_speed_once(self):
+        self.installer.artifact_mirrors = {self.slow: [self.fast]}
+
+        self.assertEqual(self.installer.rank_sources(self.slow), [self.fast, self.slow])
+        probes = len(self.requests_for('sources/image.bin'))
+        self.assertEqual(self.installer.rank_sources(self.slow), [self.fast, self.slow])
+        self.assertEqual(len(self.requests_for('sources/image.bin')), probes)
+        self.assertEqual(self.installer.pick_source(self.slow), self.fast)
+
+    def test_stalled_source_fails_over_and_resumes(self):
+        self.installer.artifact_mirrors = {self.slow: [self.fast]}
+        self.installer._source_ranking[self.slow] = [self.slow, self.fast]
+
+        path = self.installer.download_file(self.slow, self.home, "image.bin", quiet=True)
+
+        self.assertEqual(path.read_bytes(), self.data)
+        self.assertEqual(self.installer._source_failures, {self.slow: 1})
+        resumed = [headers for query, headers in self.requests_for('sources/image.bin') if query == '']
+        self.assertEqual(len(resumed), 1)
+        self.assertTrue(resumed[0]['Range'].startswith('bytes='))
+        self.assertNotEqual(resumed[0]['Range'], 'bytes=0-')
+
+    def test_slow_source_without_alternatives_is_left_to_finish(self):
+        path = self.installer.download_file(self.slow, self.home, "image.bin", quiet=True)
+
+        self.assertEqual(path.read_bytes(), self.data)
+        self.assertEqual(self.installer._source_failures, {})
+        self.assertEqual(len(self.requests_for('sources/image.bin')), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
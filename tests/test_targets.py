@@ -0,0 +1,54 @@
+"""Bulk preparation: tools are fetched once and hardlinked into every target.
+
+Run with: python -m pytest tests  (or python -m unittest discover tests)
+"""
+
+import unittest
+from unittest import mock
+
+from support import InstallerTestCase, serve
+
+
+class PrepareTargetsTests(InstallerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for index, (key, (_, filename, extract_to)) in enumerate(self.installer.tool_artifacts.items()):
+            if not extract_to:
+                serve('targets/' + filename, 8192, seed=30 + index)
+            self.installer.app_data[key] = self.base_url + 'targets/' + filename
+        self.keys = [key for key, artifact in self.installer.tool_artifacts.items() if not artifact[2]]
+
+        def fake_recovery(job, outdir, quiet=True):
+            outdir = outdir / "com.apple.recovery.boot"
+            outdir.mkdir(parents=True, exist_ok=True)
+            (outdir / "BaseSystem.dmg").write_bytes(b'dmg')
+            job['result'] = outdir
+        patcher = mock.patch.object(self.installer, '_run_recovery_job', side_effect=fake_recovery)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_targets_share_hardlinked_tools(self):
+        targets = [('sonoma', self.home / "a"), ('sonoma', self.home / "b")]
+
+        prepared = self.installer.prepare_targets(targets, self.keys)
+
+        self.assertTrue(self.installer.targets_complete(prepared, self.keys))
+        folder, filename, _ = self.installer.tool_artifacts[self.keys[0]]
+        first, second = (self.home / target / folder / filename for target in ("a", "b"))
+        self.assertEqual(first.stat().st_ino, second.stat().st_ino)
+        self.assertEqual(self.installer._run_recovery_job.call_count, 1)
+
+    def test_missing_tool_makes_targets_incomplete(self):
+        missing = self.keys[0]
+        self.installer.app_data[missing] = self.base_url + 'targets/missing.bin'
+
+        prepared = self.installer.prepare_targets([('sonoma', self.home / "a")], self.keys)
+
+        self.assertNotIn(missing, prepared[str(self.home / "a")]['tools'])
+        self.assertIsNotNone(prepared[str(self.home / "a")]['recovery'])
+        self.assertFalse(self.installer.targets_complete(prepared, self.keys))
+
+
+if __name__ == '__main__':
+    unittest.main()
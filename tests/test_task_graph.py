@@ -0,0 +1,111 @@
+"""run_task_graph: dependency order, failure propagation and interruption.
+
+Run with: python -m pytest tests  (or python -m unittest discover tests)
+"""
+
+import threading
+import time
+import unittest
+
+from support import InstallerTestCase, serve
+
+
+class TaskGraphTests(InstallerTestCase):
+
+    def test_background_task_starts_while_interactive_task_waits(self):
+        started = {}
+        origin = time.monotonic()
+
+        def step(name, seconds):
+            def run():
+                started[name] = time.monotonic() - origin
+                time.sleep(seconds)
+                return True
+            return run
+
+        results = self.installer.run_task_graph({
+            'tools': {'run': step('tools', 0.2)},
+            'recovery': {'run': step('recovery', 0.1), 'deps': ['tools']},
+            'guide': {'run': step('guide', 1.0), 'interactive': True},
+        })
+
+        self.assertTrue(all(results.values()))
+        self.assertLess(started['recovery'], 0.6)
+
+    def test_failed_task_skips_dependents_but_not_after_tasks(self):
+        ran = []
+
+        def step(name, result=True):
+            def run():
+                ran.append(name)
+                return result
+            return run
+
+        results = self.installer.run_task_graph({
+            'tools': {'run': step('tools', None)},
+            'format_usb': {'run': step('format_usb'), 'deps': ['tools'], 'interactive': True},
+            'copy_files': {'run': step('copy_files'), 'deps': ['format_usb']},
+            'bios': {'run': step('bios'), 'after': ['tools'], 'interactive': True},
+        })
+
+        self.assertEqual(sorted(ran), ['bios', 'tools'])
+        self.assertIsNone(results['format_usb'])
+        self.assertIsNone(results['copy_files'])
+        self.assertTrue(results['bios'])
+
+    def test_exception_counts_as_failure(self):
+        def boom():
+            raise IOError("no network")
+
+        completed = []
+        results = self.installer.run_task_graph(
+            {'tools': {'run': boom}, 'recovery': {'run': lambda: True}},
+            on_complete=lambda name, result: completed.append(name))
+
+        self.assertIsNone(results['tools'])
+        self.assertEqual(completed, ['recovery'])
+
+    def test_interrupt_does_not_wait_for_background_tasks(self):
+        stop = threading.Event()
+
+        def long_download():
+            while not stop.wait(0.05):
+                self.installer._check_cancelled()
+
+        def interrupt():
+            time.sleep(0.1)
+            raise KeyboardInterrupt
+
+        started = time.monotonic()
+        with self.assertRaises(KeyboardInterrupt):
+            self.installer.run_task_graph({
+                'recovery': {'run': long_download},
+                'guide': {'run': interrupt, 'interactive': True},
+            })
+        elapsed = time.monotonic() - started
+        stop.set()
+
+        self.assertLess(elapsed, 1.0)
+        self.assertTrue(self.installer._cancelled.is_set())
+
+
+class ToolStepTests(InstallerTestCase):
+
+    def test_tools_step_fails_when_an_artifact_is_missing(self):
+        for key, (_, filename, _) in self.installer.tool_artifacts.items():
+            self.installer.app_data[key] = self.base_url + 'missing/' + filename
+
+        self.assertIsNone(self.installer.download_all_tools(['usbtoolbox_url', 'rufus_url']))
+        self.assertIsNone(self.installer.download_opencorepkg())
+
+    def test_tools_step_succeeds_when_all_artifacts_download(self):
+        serve('tools/USBToolBox.exe', 4096)
+        serve('tools/Rufus.exe', 4096, seed=1)
+        self.installer.app_data['usbtoolbox_url'] = self.base_url + 'tools/USBToolBox.exe'
+        self.installer.app_data['rufus_url'] = self.base_url + 'tools/Rufus.exe'
+
+        self.assertTrue(self.installer.download_all_tools(['usbtoolbox_url', 'rufus_url']))
+
+
+if __name__ == '__main__':
+    unittest.main()